@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from core.metrics import observe_audit_flush
+
+from .models import AuditEvent
+from .rollups import bump_rollups
+
+_thread_locals = threading.local()
+
+
+def write_events(events: List[AuditEvent]) -> None:
+    """Persist a batch of unsaved AuditEvent rows in one INSERT and update the rollups."""
+    if not events:
+        return
+    start = time.perf_counter()
+    with transaction.atomic():
+        AuditEvent.objects.bulk_create(events)
+        bump_rollups(events)
+    observe_audit_flush(len(events), time.perf_counter() - start)
+
+
+class AuditBuffer:
+    """Collect audit events and write them with a single bulk_create.
+
+    Events recorded inside a transaction are only staged once that
+    transaction commits, so a rollback drops them together with the change
+    they describe.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, int(max_size))
+        self.events: List[AuditEvent] = []
+
+    def add(self, event: AuditEvent) -> None:
+        transaction.on_commit(partial(self._stage, event))
+
+    def _stage(self, event: AuditEvent) -> None:
+        self.events.append(event)
+        if len(self.events) >= self.max_size:
+            self.flush()
+
+    def flush(self) -> None:
+        events, self.events = self.events, []
+        write_events(events)
+
+
+def get_current_buffer() -> Optional[AuditBuffer]:
+    return getattr(_thread_locals, "buffer", None)
+
+
+@contextmanager
+def audit_buffer(max_size: Optional[int] = None) -> Iterator[AuditBuffer]:
+    """Buffer audit events for the duration of the block.
+
+    Nested blocks share the outermost buffer. On exit the buffer is flushed
+    in ``transaction.on_commit``, i.e. immediately in autocommit mode.
+    """
+    current = get_current_buffer()
+    if current is not None:
+        yield current
+        return
+    if max_size is None:
+        max_size = getattr(settings, "AUDIT_BUFFER_MAX_SIZE", 100)
+    buffer = AuditBuffer(max_size)
+    _thread_locals.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        _thread_locals.buffer = None
+        transaction.on_commit(buffer.flush)
+
+
+def record_event(event: AuditEvent) -> None:
+    """Queue an event on the active buffer, or write it right away."""
+    buffer = get_current_buffer()
+    if buffer is None:
+        write_events([event])
+        return
+    buffer.add(event)
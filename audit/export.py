@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import csv
+import json
+import zlib
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import AuditEvent
+
+
+EXPORT_FIELDS = (
+    "id",
+    "created_at",
+    "action",
+    "entity_type",
+    "entity_id",
+    "site",
+    "actor_id",
+    "actor__email",
+    "summary",
+    "ip_address",
+    "user_agent",
+    "before_json",
+    "after_json",
+    "changes_json",
+)
+JSON_FIELDS = {"before_json", "after_json", "changes_json"}
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+def export_queryset(date_from: date, date_to: date, site: Optional[str] = None, queryset=None):
+    """Events created from ``date_from`` to ``date_to`` (inclusive), oldest first."""
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    qs = AuditEvent.objects.all() if queryset is None else queryset
+    qs = qs.filter(created_at__gte=start, created_at__lt=end)
+    if site:
+        qs = qs.filter(site=site)
+    return qs.order_by("created_at", "id").values_list(*EXPORT_FIELDS)
+
+
+def _rows(queryset) -> Iterator[tuple]:
+    # iterator() streams through a server-side cursor on PostgreSQL.
+    return queryset.iterator(chunk_size=getattr(settings, "AUDIT_EXPORT_CHUNK_SIZE", 2000))
+
+
+def iter_ndjson(queryset) -> Iterator[str]:
+    for row in _rows(queryset):
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    json_positions = [i for i, name in enumerate(EXPORT_FIELDS) if name in JSON_FIELDS]
+    for row in _rows(queryset):
+        row = list(row)
+        for i in json_positions:
+            row[i] = "" if row[i] is None else json.dumps(row[i], cls=DjangoJSONEncoder)
+        yield writer.writerow(row)
+
+
+def iter_export(queryset, fmt: str) -> Iterator[str]:
+    if fmt == "csv":
+        return iter_csv(queryset)
+    return iter_ndjson(queryset)
+
+
+def encode_chunks(lines: Iterable[str], compress: bool = False, chunk_bytes: int = 64 * 1024) -> Iterator[bytes]:
+    """Group lines into ~chunk_bytes blocks, gzip-compressed on the fly if requested."""
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending = []
+    size = 0
+    for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= chunk_bytes:
+            block = b"".join(pending)
+            pending, size = [], 0
+            block = compressor.compress(block) if compressor else block
+            if block:
+                yield block
+    block = b"".join(pending)
+    if compressor:
+        block = compressor.compress(block) + compressor.flush()
+    if block:
+        yield block
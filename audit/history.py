@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from django.db.models import Q
+
+from .models import AuditEvent
+from .utils import diff_snapshots
+
+
+def event_changes(event: AuditEvent) -> Dict[str, list]:
+    """Changed fields of an UPDATE event as {field: [old, new]}, whatever its storage mode."""
+    if event.changes_json is not None:
+        return event.changes_json
+    return diff_snapshots(event.before_json or {}, event.after_json or {})
+
+
+def entity_state_at(entity_type: str, entity_id, at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """Rebuild an entity's field state as of ``at`` (default: now) from its audit trail.
+
+    Starts from the latest full snapshot (CREATE, DELETE or a full-mode
+    UPDATE) and replays the deltas recorded after it. Returns None if the
+    entity did not exist at that time.
+    """
+    events = AuditEvent.objects.filter(
+        entity_type=entity_type,
+        entity_id=str(entity_id),
+        action__in=["CREATE", "UPDATE", "DELETE"],
+    )
+    if at is not None:
+        events = events.filter(created_at__lte=at)
+    anchor = (
+        events.filter(Q(action__in=["CREATE", "DELETE"]) | Q(after_json__isnull=False))
+        .order_by("-created_at", "-id")
+        .values("id", "created_at", "action", "after_json")
+        .first()
+    )
+    if anchor is None:
+        return None
+    if anchor["action"] == "DELETE":
+        return None
+    state = dict(anchor["after_json"] or {})
+    deltas = (
+        events.filter(action="UPDATE", changes_json__isnull=False)
+        .filter(Q(created_at__gt=anchor["created_at"]) | Q(created_at=anchor["created_at"], id__gt=anchor["id"]))
+        .order_by("created_at", "id")
+        .values_list("changes_json", flat=True)
+    )
+    for changes in deltas:
+        for name, (_old, new) in changes.items():
+            state[name] = new
+    return state
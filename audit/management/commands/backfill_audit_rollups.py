@@ -0,0 +1,26 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from audit.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild hourly audit rollups from raw audit events"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", help="First day to rebuild (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", help="Last day to rebuild, inclusive (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        try:
+            start = self._day_start(options["date_from"]) if options["date_from"] else None
+            end = self._day_start(options["date_to"]) + timedelta(days=1) if options["date_to"] else None
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        written = rebuild_rollups(start, end)
+        self.stdout.write(self.style.SUCCESS(f"{written} rollup rows written"))
+
+    @staticmethod
+    def _day_start(value: str) -> datetime:
+        return datetime.combine(date.fromisoformat(value), time.min, tzinfo=timezone.utc)
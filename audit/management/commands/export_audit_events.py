@@ -0,0 +1,37 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from audit.export import EXPORT_FORMATS, encode_chunks, export_queryset, iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream audit events for a date range to a file or stdout as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", required=True, help="First day (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", required=True, help="Last day, inclusive (YYYY-MM-DD)")
+        parser.add_argument("--site")
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument("--output", help="Output file (default: stdout)")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output")
+
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options["date_from"])
+            date_to = date.fromisoformat(options["date_to"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        rows = export_queryset(date_from, date_to, options["site"])
+        chunks = encode_chunks(iter_export(rows, options["format"]), compress=options["gzip"])
+        if options["output"]:
+            with open(options["output"], "wb") as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Export written to {options['output']}"))
+        else:
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from django.http import HttpRequest
+
+from .buffer import audit_buffer
+
+
+class AuditBufferMiddleware:
+    """Batch the audit events raised while handling a request."""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        with audit_buffer():
+            return self.get_response(request)
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auditevent",
+            name="changes_json",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
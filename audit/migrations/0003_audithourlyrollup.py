@@ -0,0 +1,28 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0002_auditevent_changes_json"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditHourlyRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("hour", models.DateTimeField()),
+                ("action", models.CharField(choices=[("CREATE", "Create"), ("UPDATE", "Update"), ("DELETE", "Delete"), ("STATUS_CHANGE", "Status Change"), ("UPLOAD_DOC", "Upload Document"), ("STOCK_MOVE", "Stock Move"), ("SALE", "Sale")], max_length=30)),
+                ("site", models.CharField(blank=True, max_length=10)),
+                ("event_count", models.PositiveIntegerField(default=0)),
+                ("actor", models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["hour", "action", "site"], name="audit_rollup_hour_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_rollups(apps, schema_editor):
+    """Fold rows sharing (hour, action, site, actor) into one before adding the constraints."""
+    Rollup = apps.get_model("audit", "AuditHourlyRollup")
+    duplicates = (
+        Rollup.objects.values("hour", "action", "site", "actor_id")
+        .annotate(rows=Count("id"), total=Sum("event_count"))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        same = Rollup.objects.filter(
+            hour=row["hour"], action=row["action"], site=row["site"], actor_id=row["actor_id"]
+        ).order_by("id")
+        keep = same.first()
+        same.exclude(pk=keep.pk).delete()
+        Rollup.objects.filter(pk=keep.pk).update(event_count=row["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0004_auditevent_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_rollups, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="audithourlyrollup",
+            constraint=models.UniqueConstraint(condition=models.Q(("actor__isnull", False)), fields=("hour", "action", "site", "actor"), name="audit_rollup_actor_uniq"),
+        ),
+        migrations.AddConstraint(
+            model_name="audithourlyrollup",
+            constraint=models.UniqueConstraint(condition=models.Q(("actor__isnull", True)), fields=("hour", "action", "site"), name="audit_rollup_anonymous_uniq"),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+
+def backfill_audit_rollups(apps, schema_editor):
+    """Rebuild the hourly rollups from existing events (same grouping as audit.rollups.rebuild_rollups)."""
+    AuditEvent = apps.get_model("audit", "AuditEvent")
+    AuditHourlyRollup = apps.get_model("audit", "AuditHourlyRollup")
+    rows = (
+        AuditEvent.objects.annotate(hour=TruncHour("created_at"))
+        .values("hour", "action", "site", "actor_id")
+        .annotate(event_count=Count("id"))
+        .order_by()
+    )
+    AuditHourlyRollup.objects.all().delete()
+    AuditHourlyRollup.objects.bulk_create(
+        (
+            AuditHourlyRollup(
+                hour=row["hour"],
+                action=row["action"],
+                site=row["site"] or "",
+                actor_id=row["actor_id"],
+                event_count=row["event_count"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0005_audithourlyrollup_unique"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_audit_rollups, migrations.RunPython.noop),
+    ]
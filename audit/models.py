@@ -22,9 +22,46 @@ class AuditEvent(models.Model):
     summary = models.CharField(max_length=255)
     before_json = models.JSONField(null=True, blank=True)
     after_json = models.JSONField(null=True, blank=True)
+    changes_json = models.JSONField(null=True, blank=True)
     ip_address = models.CharField(max_length=100, blank=True)
     user_agent = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="audit_created_idx"),
+            models.Index(fields=["site", "created_at"], name="audit_site_created_idx"),
+            models.Index(fields=["action", "created_at"], name="audit_action_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.action} {self.entity_type} {self.entity_id}"
+
+
+class AuditHourlyRollup(models.Model):
+    """Number of audit events per hour, action, site and actor."""
+
+    hour = models.DateTimeField()
+    action = models.CharField(max_length=30, choices=AuditEvent.ACTION_CHOICES)
+    site = models.CharField(max_length=10, blank=True)
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
+    event_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=["hour", "action", "site"], name="audit_rollup_hour_idx")]
+        # NULL actors are distinct in a plain unique index, hence the second, partial one.
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hour", "action", "site", "actor"],
+                condition=models.Q(actor__isnull=False),
+                name="audit_rollup_actor_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["hour", "action", "site"],
+                condition=models.Q(actor__isnull=True),
+                name="audit_rollup_anonymous_uniq",
+            ),
+        ]
+
     def __str__(self) -> str:
-        return f"{self.action} {self.entity_type} {self.entity_id}"
\ No newline at end of file
+        return f"{self.hour:%Y-%m-%d %H}h {self.action} {self.site} x{self.event_count}"
@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class AuditEventCursorPagination(CursorPagination):
+    """Keyset pagination over (created_at, id), newest first."""
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = ("-created_at", "-id")
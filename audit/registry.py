@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Sequence
+
+from django.conf import settings
+from django.db.models.signals import post_save, pre_delete, pre_save
+
+from core.middleware import get_current_user, get_client_ip, get_user_agent
+from .buffer import record_event
+from .models import AuditEvent
+from .sites import resolve_site
+from .utils import diff_snapshots, serialize_instance, serialize_loaded_state
+
+
+DEFAULT_SUMMARIES = {
+    "CREATE": "Created {model} {pk}",
+    "UPDATE": "Updated {model} {pk}",
+    "DELETE": "Deleted {model} {pk}",
+}
+
+
+@dataclass
+class AuditOptions:
+    """How CREATE/UPDATE/DELETE events are recorded for one model."""
+
+    model: type
+    fields: Optional[Sequence[str]] = None
+    site_resolver: Callable[[object], str] = resolve_site
+    summaries: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_SUMMARIES))
+
+    def snapshot(self, instance) -> dict:
+        return serialize_instance(instance, fields=self.fields)
+
+    def loaded_snapshot(self, instance) -> Optional[dict]:
+        return serialize_loaded_state(instance, fields=self.fields)
+
+    def summary(self, action: str, instance) -> str:
+        template = self.summaries.get(action) or DEFAULT_SUMMARIES[action]
+        return template.format(model=self.model.__name__, pk=instance.pk, instance=instance)
+
+
+_registry: Dict[type, AuditOptions] = {}
+
+
+def register(
+    model: type,
+    *,
+    fields: Optional[Sequence[str]] = None,
+    site_resolver: Optional[Callable[[object], str]] = None,
+    summaries: Optional[Dict[str, str]] = None,
+) -> AuditOptions:
+    """Track saves and deletes of ``model`` in the audit trail.
+
+    Receivers are connected for this sender only, so untracked models never
+    reach the audit code.
+    """
+    options = AuditOptions(model=model, fields=fields)
+    if site_resolver is not None:
+        options.site_resolver = site_resolver
+    if summaries:
+        options.summaries.update(summaries)
+    _registry[model] = options
+    uid = model._meta.label_lower
+    pre_save.connect(capture_pre_save, sender=model, dispatch_uid=f"audit_pre_save_{uid}")
+    post_save.connect(create_or_update_audit, sender=model, dispatch_uid=f"audit_post_save_{uid}")
+    pre_delete.connect(create_delete_audit, sender=model, dispatch_uid=f"audit_pre_delete_{uid}")
+    return options
+
+
+def get_options(model: type) -> Optional[AuditOptions]:
+    return _registry.get(model)
+
+
+def is_tracked(model: type) -> bool:
+    return model in _registry
+
+
+def _json_safe(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    return str(value)
+
+
+def stores_deltas() -> bool:
+    return getattr(settings, "AUDIT_STORAGE_MODE", "delta") == "delta"
+
+
+def create_audit(
+    action: str,
+    instance,
+    before_json: Optional[dict],
+    after_json: Optional[dict],
+    summary: str,
+    changes: Optional[dict] = None,
+    entity_type: Optional[str] = None,
+    entity_id=None,
+):
+    """Record an event about ``instance``, or about ``entity_type``/``entity_id`` when given."""
+    options = get_options(instance.__class__)
+    site_resolver = options.site_resolver if options else resolve_site
+    user = get_current_user()
+    if user is not None and not getattr(user, "is_authenticated", False):
+        user = None
+    record_event(AuditEvent(
+        actor=user,
+        action=action,
+        entity_type=entity_type or instance.__class__.__name__,
+        entity_id=str(instance.pk if entity_id is None else entity_id),
+        site=site_resolver(instance),
+        summary=summary,
+        before_json=_json_safe(before_json),
+        after_json=_json_safe(after_json),
+        changes_json=changes,
+        ip_address=get_client_ip(),
+        user_agent=get_user_agent(),
+    ))
+
+
+def capture_pre_save(sender, instance, **kwargs):
+    if not instance.pk:
+        return
+    options = _registry[sender]
+    snapshot = options.loaded_snapshot(instance)
+    if snapshot is None:
+        # Instance was not loaded through the ORM (or had deferred fields).
+        try:
+            snapshot = options.snapshot(sender.objects.get(pk=instance.pk))
+        except sender.DoesNotExist:
+            snapshot = None
+    instance._pre_save_snapshot = snapshot
+
+
+def create_or_update_audit(sender, instance, created, **kwargs):
+    options = _registry[sender]
+    before_json = getattr(instance, "_pre_save_snapshot", None)
+    after_json = options.snapshot(instance)
+    instance.remember_loaded_state()
+    if created:
+        create_audit("CREATE", instance, None, after_json, options.summary("CREATE", instance))
+    elif before_json is not None and stores_deltas():
+        changes = diff_snapshots(before_json, after_json, sender)
+        if changes:
+            create_audit(
+                "UPDATE", instance, None, None, options.summary("UPDATE", instance), changes=_json_safe(changes)
+            )
+    else:
+        create_audit("UPDATE", instance, before_json, after_json, options.summary("UPDATE", instance))
+
+
+def create_delete_audit(sender, instance, **kwargs):
+    options = _registry[sender]
+    before_json = options.snapshot(instance)
+    create_audit("DELETE", instance, before_json, None, options.summary("DELETE", instance))
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncHour
+
+from .models import AuditEvent, AuditHourlyRollup
+
+
+def _hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def bump_rollups(events: Iterable[AuditEvent]) -> None:
+    """Add freshly written events to their hourly rollup rows.
+
+    The rows are unique per key, so when a concurrent flush inserts the same
+    row first the insert fails and the increment is applied to that row.
+    """
+    _add_counts(Counter((_hour(e.created_at), e.action, e.site or "", e.actor_id) for e in events))
+
+
+def fold_actor_rollups(actor_id: int) -> None:
+    """Move an actor's counts onto the anonymous rows before the actor is deleted.
+
+    Nulling the FK instead would collide with existing anonymous rows of the
+    same hour, action and site.
+    """
+    rows = AuditHourlyRollup.objects.filter(actor_id=actor_id)
+    counts = Counter()
+    for hour, action, site, n in rows.values_list("hour", "action", "site", "event_count"):
+        counts[(hour, action, site, None)] += n
+    rows.delete()
+    _add_counts(counts)
+
+
+def _add_counts(counts: Counter) -> None:
+    for (hour, action, site, actor_id), n in counts.items():
+        key = {"hour": hour, "action": action, "site": site, "actor_id": actor_id}
+        rows = AuditHourlyRollup.objects.filter(**key)
+        if rows.update(event_count=F("event_count") + n):
+            continue
+        try:
+            with transaction.atomic():
+                AuditHourlyRollup.objects.create(event_count=n, **key)
+        except IntegrityError:
+            rows.update(event_count=F("event_count") + n)
+
+
+def rebuild_rollups(start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+    """Recompute rollups for [start, end) from raw events; returns the number of rows written."""
+    events = AuditEvent.objects.all()
+    rollups = AuditHourlyRollup.objects.all()
+    if start is not None:
+        events = events.filter(created_at__gte=_hour(start))
+        rollups = rollups.filter(hour__gte=_hour(start))
+    if end is not None:
+        events = events.filter(created_at__lt=end)
+        rollups = rollups.filter(hour__lt=end)
+    rows = (
+        events.annotate(hour=TruncHour("created_at"))
+        .values("hour", "action", "site", "actor_id")
+        .annotate(event_count=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = AuditHourlyRollup.objects.bulk_create(
+            AuditHourlyRollup(
+                hour=row["hour"],
+                action=row["action"],
+                site=row["site"] or "",
+                actor_id=row["actor_id"],
+                event_count=row["event_count"],
+            )
+            for row in rows.iterator()
+        )
+    return len(created)
@@ -0,0 +1,104 @@
+"""Site resolution for audit events without lazy-loading related objects.
+
+Related shipments and purchase orders are looked up by FK id through a
+small per-process cache, kept current by the save/delete receivers in
+``audit.signals`` once the change commits. The cache is not shared: other
+gunicorn workers keep their entry until AUDIT_SITE_CACHE_TTL expires, so for
+up to that long their events may carry a shipment's previous site.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import connection
+
+from core.metrics import record_cache
+
+from logistics.models import ContainerShipment
+from supply.models import PurchaseOrder
+
+
+class SiteCache:
+    """LRU map of object id -> site code with a time-to-live."""
+
+    def __init__(self, name: str, loader: Callable[[int], Optional[str]], max_size: int = 10000):
+        self.name = name
+        self.loader = loader
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, pk: int) -> str:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(pk)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(pk)
+                record_cache(self.name, True)
+                return entry[0]
+        record_cache(self.name, False)
+        site = self.loader(pk) or ""
+        # A read inside a transaction may see uncommitted changes; don't keep it.
+        if not connection.in_atomic_block:
+            self.set(pk, site)
+        return site
+
+    def set(self, pk: int, site: Optional[str]) -> None:
+        expires = time.monotonic() + getattr(settings, "AUDIT_SITE_CACHE_TTL", 300)
+        with self._lock:
+            self._entries[pk] = (site or "", expires)
+            self._entries.move_to_end(pk)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def forget(self, pk: int) -> None:
+        with self._lock:
+            self._entries.pop(pk, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+shipment_sites = SiteCache(
+    "audit_shipment_sites",
+    lambda pk: ContainerShipment.objects.filter(pk=pk).values_list("destination_site", flat=True).first()
+)
+purchase_order_sites = SiteCache(
+    "audit_po_sites",
+    lambda pk: PurchaseOrder.objects.filter(pk=pk).values_list("site", flat=True).first()
+)
+
+
+def _related_site(instance, field_name: str, cache: SiteCache, site_attr: str) -> Optional[str]:
+    pk = getattr(instance, f"{field_name}_id", None)
+    if pk is None:
+        return None
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        related = field.get_cached_value(instance)
+        if related is not None:
+            return getattr(related, site_attr) or ""
+    return cache.get(pk)
+
+
+def resolve_site(instance) -> str:
+    """Site code for an audited instance, from its own fields or related FK ids."""
+    if hasattr(instance, "site"):
+        return getattr(instance, "site") or ""
+    if hasattr(instance, "destination_site"):
+        return getattr(instance, "destination_site") or ""
+    for field_name in ("shipment", "linked_shipment"):
+        if hasattr(instance, f"{field_name}_id"):
+            site = _related_site(instance, field_name, shipment_sites, "destination_site")
+            if site is not None:
+                return site
+    if hasattr(instance, "linked_po_id"):
+        site = _related_site(instance, "linked_po", purchase_order_sites, "site")
+        if site is not None:
+            return site
+    return ""
@@ -1,5 +1,7 @@
-from typing import Any, Dict
+from itertools import chain
+from typing import Any, Dict, Optional, Sequence
 
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from django.forms.models import model_to_dict
 
 
@@ -9,7 +11,77 @@ def sanitize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
     return data
 
 
-def serialize_instance(instance) -> Dict[str, Any]:
+def serialize_instance(instance, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
     """Serialize a model instance to a sanitized dict."""
-    data = model_to_dict(instance)
+    data = model_to_dict(instance, fields=fields)
+    return sanitize_dict(data)
+
+
+def _normalized(model, name: str, value: Any) -> Any:
+    if model is None or value is None:
+        return value
+    try:
+        return model._meta.get_field(name).to_python(value)
+    except (FieldDoesNotExist, ValidationError, TypeError):
+        return value
+
+
+def diff_snapshots(before: Dict[str, Any], after: Dict[str, Any], model=None) -> Dict[str, list]:
+    """Return the changed fields of two raw snapshots as {field: [old, new]}.
+
+    With ``model``, values are compared after ``field.to_python`` so that
+    e.g. Decimal("10") and "10.00" or a date and its ISO string are equal.
+    """
+    keys = list(after) + [k for k in before if k not in after]
+    return {
+        k: [before.get(k), after.get(k)]
+        for k in keys
+        if _normalized(model, k, before.get(k)) != _normalized(model, k, after.get(k))
+    }
+
+
+class LoadedStateMixin:
+    """Remember the field values a model instance was loaded or saved with.
+
+    Lets the audit trail build its "before" snapshot from memory instead of
+    re-reading the row in pre_save.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_loaded_state()
+
+    def remember_loaded_state(self) -> None:
+        self._loaded_state = {
+            f.attname: self.__dict__[f.attname]
+            for f in self._meta.concrete_fields
+            if f.attname in self.__dict__
+        }
+
+    def loaded_value(self, attname: str, default: Any = None) -> Any:
+        """Value of ``attname`` as last loaded or saved, or ``default`` if unknown."""
+        return (getattr(self, "_loaded_state", None) or {}).get(attname, default)
+
+
+def serialize_loaded_state(instance, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """Serialize the remembered state like serialize_instance, or None if unknown."""
+    state = getattr(instance, "_loaded_state", None)
+    if state is None:
+        return None
+    opts = instance._meta
+    data = {}
+    for f in chain(opts.concrete_fields, opts.private_fields, opts.many_to_many):
+        if not getattr(f, "editable", False):
+            continue
+        if fields is not None and f.name not in fields:
+            continue
+        if f.attname not in state:
+            return None
+        data[f.name] = state[f.attname]
     return sanitize_dict(data)
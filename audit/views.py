@@ -1,15 +1,48 @@
+from datetime import date
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
 from core.permissions import filter_queryset_by_site
+from .export import EXPORT_FORMATS, encode_chunks, export_queryset, iter_export
 from .filters import AuditEventFilter
 from .models import AuditEvent
+from .pagination import AuditEventCursorPagination
 from .serializers import AuditEventSerializer
 
 
 class AuditEventViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = AuditEvent.objects.all().order_by("-created_at")
+    queryset = AuditEvent.objects.all()
     serializer_class = AuditEventSerializer
     filterset_class = AuditEventFilter
+    pagination_class = AuditEventCursorPagination
 
     def get_queryset(self):
-        return filter_queryset_by_site(AuditEvent.objects.all().order_by("-created_at"), self.request.user, ["site"])
\ No newline at end of file
+        return filter_queryset_by_site(AuditEvent.objects.all(), self.request.user, ["site"])
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """Stream raw events for a date range as NDJSON (default) or CSV."""
+        fmt = request.query_params.get("fmt") or "ndjson"
+        if fmt not in EXPORT_FORMATS:
+            return Response({"detail": f"fmt must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+        try:
+            date_from = date.fromisoformat(request.query_params["from"])
+            date_to = date.fromisoformat(request.query_params.get("to") or timezone.localdate().isoformat())
+        except (KeyError, ValueError):
+            return Response({"detail": "from (and optional to) must be YYYY-MM-DD dates"}, status=400)
+
+        site = request.query_params.get("site") or None
+        rows = export_queryset(date_from, date_to, site, queryset=self.get_queryset())
+        compress = "gzip" in request.headers.get("Accept-Encoding", "")
+        response = StreamingHttpResponse(
+            encode_chunks(iter_export(rows, fmt), compress=compress),
+            content_type="text/csv" if fmt == "csv" else "application/x-ndjson",
+        )
+        if compress:
+            response["Content-Encoding"] = "gzip"
+        response["Content-Disposition"] = f'attachment; filename="audit_{date_from}_{date_to}.{fmt}"'
+        return response
@@ -0,0 +1,47 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0003_clientchatmessage_sender_type"),
+        ("logistics", "0003_shipment_search_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatReadCursor",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("channel", models.CharField(choices=[("team", "Team chat"), ("client", "Client chat")], max_length=10)),
+                ("last_read_at", models.DateTimeField()),
+                ("last_read_id", models.PositiveBigIntegerField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(fields=["shipment", "created_at"], name="chat_shipment_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="clientchatmessage",
+            index=models.Index(fields=["shipment", "created_at"], name="client_chat_shipment_idx"),
+        ),
+        migrations.AddField(
+            model_name="chatreadcursor",
+            name="shipment",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="chat_read_cursors", to="logistics.containershipment"),
+        ),
+        migrations.AddField(
+            model_name="chatreadcursor",
+            name="user",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="chat_read_cursors", to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name="chatreadcursor",
+            constraint=models.UniqueConstraint(fields=("user", "shipment", "channel"), name="unique_chat_read_cursor"),
+        ),
+    ]
@@ -0,0 +1,35 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def start_unread_tracking(apps, schema_editor):
+    """Existing users start with their whole chat history read, instead of every past message unread."""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    ChatReadWatermark = apps.get_model("chat", "ChatReadWatermark")
+    now = timezone.now()
+    ChatReadWatermark.objects.bulk_create(
+        (ChatReadWatermark(user_id=pk, since=now) for pk in User.objects.values_list("pk", flat=True).iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0004_chatreadcursor"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatReadWatermark",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("since", models.DateTimeField()),
+                ("user", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="chat_read_watermark", to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(start_unread_tracking, migrations.RunPython.noop),
+    ]
@@ -15,6 +15,11 @@ class ChatMessage(models.Model):
     body = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["shipment", "created_at"], name="chat_shipment_created_idx"),
+        ]
+
     def __str__(self) -> str:
         shipment_ref = ""
         try:
@@ -35,6 +40,11 @@ class ClientChatMessage(models.Model):
     body = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["shipment", "created_at"], name="client_chat_shipment_idx"),
+        ]
+
     def __str__(self) -> str:
         shipment_ref = ""
         try:
@@ -42,3 +52,42 @@ class ClientChatMessage(models.Model):
         except Exception:
             shipment_ref = ""
         return shipment_ref or f"ClientMsg #{self.pk}"
+
+
+class ChatReadCursor(models.Model):
+    """Last message a user has read in one chat of a shipment."""
+
+    CHANNEL_TEAM = "team"
+    CHANNEL_CLIENT = "client"
+    CHANNEL_CHOICES = [
+        (CHANNEL_TEAM, "Team chat"),
+        (CHANNEL_CLIENT, "Client chat"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="chat_read_cursors")
+    shipment = models.ForeignKey(ContainerShipment, on_delete=models.CASCADE, related_name="chat_read_cursors")
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    last_read_at = models.DateTimeField()
+    last_read_id = models.PositiveBigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "shipment", "channel"], name="unique_chat_read_cursor"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id}:{self.shipment_id}:{self.channel}"
+
+
+class ChatReadWatermark(models.Model):
+    """Messages created before ``since`` count as read for the user, cursor or not.
+
+    Users without a row fall back to their ``date_joined``.
+    """
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="chat_read_watermark")
+    since = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.user_id}:{self.since:%Y-%m-%d %H:%M}"
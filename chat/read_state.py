@@ -0,0 +1,56 @@
+"""Per-user read cursors and grouped unread counts for shipment chats."""
+from __future__ import annotations
+
+from typing import Dict
+
+from django.db.models import Count, F, FilteredRelation, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import ChatMessage, ChatReadCursor, ChatReadWatermark, ClientChatMessage
+
+CHANNEL_MODELS = {
+    ChatReadCursor.CHANNEL_TEAM: ChatMessage,
+    ChatReadCursor.CHANNEL_CLIENT: ClientChatMessage,
+}
+
+
+def mark_read(user, shipment_id: int, channel: str, message) -> None:
+    """Move the user's cursor forward to ``message``; never moves it back."""
+    if message is None or not getattr(user, "is_authenticated", False):
+        return
+    newer = Q(last_read_at__lt=message.created_at) | Q(last_read_at=message.created_at, last_read_id__lt=message.pk)
+    cursors = ChatReadCursor.objects.filter(user=user, shipment_id=shipment_id, channel=channel)
+    if cursors.filter(newer).update(last_read_at=message.created_at, last_read_id=message.pk):
+        return
+    ChatReadCursor.objects.get_or_create(
+        user=user,
+        shipment_id=shipment_id,
+        channel=channel,
+        defaults={"last_read_at": message.created_at, "last_read_id": message.pk},
+    )
+
+
+def unread_counts(user, shipments: QuerySet, channel: str) -> Dict[int, int]:
+    """Unread messages per shipment (others' messages after the user's cursor), in one grouped query.
+
+    Only messages after the user's watermark are candidates, which keeps the
+    scan to a (shipment, created_at) index range; the cursor is joined once.
+    """
+    since = Coalesce(
+        Subquery(ChatReadWatermark.objects.filter(user=user).values("since")[:1]),
+        Value(user.date_joined),
+    )
+    unread = (
+        CHANNEL_MODELS[channel].objects.filter(shipment__in=shipments, created_at__gt=since)
+        .exclude(author=user)
+        .annotate(cursor=FilteredRelation(
+            "shipment__chat_read_cursors",
+            condition=Q(shipment__chat_read_cursors__user=user, shipment__chat_read_cursors__channel=channel),
+        ))
+        .filter(
+            Q(cursor__isnull=True)
+            | Q(created_at__gt=F("cursor__last_read_at"))
+            | Q(created_at=F("cursor__last_read_at"), id__gt=F("cursor__last_read_id"))
+        )
+    )
+    return dict(unread.order_by().values("shipment_id").annotate(count=Count("id")).values_list("shipment_id", "count"))
@@ -18,6 +18,17 @@ ALERTS_MAX_ITEMS = int(os.environ.get("ALERTS_MAX_ITEMS", "10"))
 ALERTS_REQUIRED_DOC_TYPES = [
     t.strip() for t in os.environ.get("ALERTS_REQUIRED_DOC_TYPES", "BL,INVOICE").split(",") if t.strip()
 ]
+SHIPMENT_STATS_CACHE_TTL = int(os.environ.get("SHIPMENT_STATS_CACHE_TTL", "60"))
+DASHBOARD_EXPORT_CHUNK_SIZE = int(os.environ.get("DASHBOARD_EXPORT_CHUNK_SIZE", "2000"))
+LIST_COUNT_THRESHOLD = int(os.environ.get("LIST_COUNT_THRESHOLD", "1000"))
+CHAT_PAGE_SIZE = int(os.environ.get("CHAT_PAGE_SIZE", "50"))
+DIRECTION_RISK_TOP_N = int(os.environ.get("DIRECTION_RISK_TOP_N", "5"))
+DIRECTION_RISK_WEIGHTS = {
+    "missing_destination": int(os.environ.get("RISK_WEIGHT_MISSING_DESTINATION", "2")),
+    "missing_docs": int(os.environ.get("RISK_WEIGHT_MISSING_DOCS", "2")),
+    "in_transit": int(os.environ.get("RISK_WEIGHT_IN_TRANSIT", "1")),
+    "eta_overdue": int(os.environ.get("RISK_WEIGHT_ETA_OVERDUE", "1")),
+}
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -46,6 +57,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.middleware.RequestTimingMiddleware",
+    "core.middleware.MetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -53,6 +66,7 @@ MIDDLEWARE = [
       "django.contrib.messages.middleware.MessageMiddleware",
       "django.middleware.clickjacking.XFrameOptionsMiddleware",
       "core.middleware.ThreadLocalRequestMiddleware",
+      "audit.middleware.AuditBufferMiddleware",
       "core.middleware.ClientPortalAccessMiddleware",
       "core.middleware.AdminStaffOnlyMiddleware",
   ]
@@ -71,6 +85,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "core.context_processors.cloudinary_enabled",
+                "core.context_processors.chat_unread",
             ],
         },
     }
@@ -135,8 +150,33 @@ SIMPLE_JWT = {
 }
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+REALTIME_BACKEND = os.environ.get("REALTIME_BACKEND", "redis" if os.getenv("REDIS_URL") else "memory")
+# gunicorn runs several workers with Redis (see gunicorn.conf.py): their cache must be
+# shared so a stats or report invalidation reaches all of them.
+if REALTIME_BACKEND == "redis":
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+SSE_HEARTBEAT_SECONDS = int(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_MAX_SECONDS = int(os.environ.get("SSE_MAX_SECONDS", "300"))
+# Open streams per web process; keep it below GUNICORN_THREADS so page requests still get a thread.
+SSE_MAX_STREAMS = int(os.environ.get("SSE_MAX_STREAMS", "8"))
+SSE_BUSY_RETRY_MS = int(os.environ.get("SSE_BUSY_RETRY_MS", "30000"))
 
 REPORTS_OUTPUT_DIR = BASE_DIR / "reports_out"
+REPORTS_CACHE_TTL = int(os.environ.get("REPORTS_CACHE_TTL", "86400"))
+# Days recomputed by refresh_site_facts so late-arriving rows are picked up.
+SITE_FACTS_REFRESH_DAYS = int(os.environ.get("SITE_FACTS_REFRESH_DAYS", "7"))
+SITE_TRENDS_DAYS = int(os.environ.get("SITE_TRENDS_DAYS", "30"))
+AUDIT_BUFFER_MAX_SIZE = int(os.environ.get("AUDIT_BUFFER_MAX_SIZE", "100"))
+# "delta": UPDATE events only store {field: [old, new]}; "full": before/after snapshots.
+AUDIT_STORAGE_MODE = os.environ.get("AUDIT_STORAGE_MODE", "delta")
+AUDIT_SITE_CACHE_TTL = int(os.environ.get("AUDIT_SITE_CACHE_TTL", "300"))
+AUDIT_EXPORT_CHUNK_SIZE = int(os.environ.get("AUDIT_EXPORT_CHUNK_SIZE", "2000"))
+REQUEST_TIMING_ENABLED = os.getenv("REQUEST_TIMING_ENABLED", "1") == "1"
+SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", "1000"))
+SLOW_REQUEST_TOP_SQL = int(os.environ.get("SLOW_REQUEST_TOP_SQL", "5"))
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Bearer token for /metrics; without one only direct private-network requests are served.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
 
 
 
@@ -10,11 +10,11 @@ from logistics.views import ContainerShipmentViewSet, ContainerItemViewSet, Stat
 from documents.views import DocumentViewSet
 from stock.views import StockLocationViewSet, StockMovementViewSet, SaleViewSet, SaleLineViewSet
 from audit.views import AuditEventViewSet
-from reports.views import AuditReportViewSet
+from reports.views import AuditReportViewSet, SiteTrendViewSet
 from django.conf import settings
 from django.conf.urls.static import static
 
-from core.views import ClientLoginView, RoleLoginView, dashboard, dashboard_export, direction_view, document_share_view, healthz, logout_view, profile_view, reports_view, shipment_detail, shipment_documents, shipments_list
+from core.views import ClientLoginView, RoleLoginView, alert_acknowledge, chat_unread, dashboard, dashboard_activity, dashboard_export, direction_view, document_share_view, healthz, logout_view, metrics, profile_view, reports_view, shipment_chat_messages, shipment_chat_stream, shipment_detail, shipment_documents, shipments_list
 from core.views import (
     client_portal,
     dashboard_client,
@@ -24,6 +24,8 @@ from core.views import (
     client_container_documents,
     client_container_history,
     client_container_chat,
+    client_container_chat_messages,
+    client_container_chat_stream,
 )
 
 router = DefaultRouter()
@@ -42,11 +44,13 @@ router.register(r"sales", SaleViewSet, basename="sale")
 router.register(r"sale-lines", SaleLineViewSet, basename="saleline")
 router.register(r"audit-events", AuditEventViewSet, basename="auditevent")
 router.register(r"reports/audit", AuditReportViewSet, basename="auditreport")
+router.register(r"reports/site-trends", SiteTrendViewSet, basename="sitetrend")
 
 urlpatterns = [
     path("", RedirectView.as_view(url="/dashboard/", permanent=False)),
     path("admin/", admin.site.urls),
     path("healthz", healthz, name="healthz"),
+    path("metrics", metrics, name="metrics"),
     path("login/", RoleLoginView.as_view(), name="login"),
     path("client/login/", ClientLoginView.as_view(), name="client_login"),
     path("client/login/", RedirectView.as_view(url="/login/", permanent=False)),
@@ -54,10 +58,15 @@ urlpatterns = [
     path("profile/", profile_view, name="profile"),
     path("dashboard/", dashboard, name="dashboard"),
     path("dashboard/export.csv", dashboard_export, name="dashboard_export"),
+    path("dashboard/activity/", dashboard_activity, name="dashboard_activity"),
+    path("alerts/<int:alert_id>/ack/", alert_acknowledge, name="alert_acknowledge"),
+    path("chat/unread/", chat_unread, name="chat_unread"),
     path("direction/", direction_view, name="direction"),
     path("shipments/", shipments_list, name="shipments_list"),
     path("shipments/<int:shipment_id>/", shipment_detail, name="shipment_detail"),
     path("shipments/<int:shipment_id>/documents/", shipment_documents, name="shipment_documents"),
+    path("shipments/<int:shipment_id>/chat/messages/", shipment_chat_messages, name="shipment_chat_messages"),
+    path("shipments/<int:shipment_id>/chat/stream/", shipment_chat_stream, name="shipment_chat_stream"),
     path("client/", client_portal, name="client_portal"),
     path("client/dashboard/", dashboard_client, name="client_dashboard"),
     path("client/containers/", containers_list, name="client_containers_list"),
@@ -65,6 +74,8 @@ urlpatterns = [
     path("client/containers/<int:id>/documents/", client_container_documents, name="client_container_documents"),
     path("client/containers/<int:id>/history/", client_container_history, name="client_container_history"),
     path("client/containers/<int:id>/chat/", client_container_chat, name="client_container_chat"),
+    path("client/containers/<int:id>/chat/messages/", client_container_chat_messages, name="client_container_chat_messages"),
+    path("client/containers/<int:id>/chat/stream/", client_container_chat_stream, name="client_container_chat_stream"),
     path("reports/", reports_view, name="reports"),
     path("documents/share/<str:token>/", document_share_view, name="document_share_view"),
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
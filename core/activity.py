@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from chat.models import ChatMessage
+from documents.models import Document
+from logistics.models import ContainerShipment
+from .models import ActivityEvent, ShipmentUpdate
+from .pagination import decode_cursor, encode_cursor, older_than
+
+
+def document_action(doc: Document) -> str:
+    return f"a ajouté un document {doc.doc_type} (v{doc.version})"
+
+
+def chat_action(message: ChatMessage) -> str:
+    return "a envoyé un message"
+
+
+def update_action(update: ShipmentUpdate) -> str:
+    return f"statut mis à jour: {update.status}"
+
+
+def _shipment(instance, field_name: str) -> Optional[ContainerShipment]:
+    field = instance._meta.get_field(field_name)
+    if field.is_cached(instance):
+        return field.get_cached_value(instance)
+    shipment_id = getattr(instance, field.attname)
+    if shipment_id is None:
+        return None
+    return ContainerShipment.objects.only("container_no", "destination_site").filter(pk=shipment_id).first()
+
+
+def _event(kind: str, instance, field_name: str, actor_id, action: str, created_at) -> Optional[ActivityEvent]:
+    shipment = _shipment(instance, field_name)
+    if shipment is None:
+        return None
+    return ActivityEvent(
+        kind=kind,
+        shipment_id=shipment.pk,
+        destination_site=shipment.destination_site,
+        container_code=shipment.container_no or "",
+        actor_id=actor_id,
+        action=action,
+        created_at=created_at,
+    )
+
+
+def event_for_document(doc: Document) -> Optional[ActivityEvent]:
+    return _event("DOCUMENT", doc, "linked_shipment", doc.uploaded_by_id, document_action(doc), doc.uploaded_at)
+
+
+def event_for_chat(message: ChatMessage) -> Optional[ActivityEvent]:
+    return _event("CHAT", message, "shipment", message.author_id, chat_action(message), message.created_at)
+
+
+def event_for_update(update: ShipmentUpdate) -> Optional[ActivityEvent]:
+    return _event("UPDATE", update, "shipment", update.created_by_id, update_action(update), update.created_at)
+
+
+def activity_page(queryset, cursor: Optional[str] = None, limit: int = 15) -> Tuple[List[ActivityEvent], Optional[str]]:
+    """One keyset page of the feed, newest first, plus the cursor of the next page."""
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        queryset = queryset.filter(older_than(position))
+    events = list(queryset.select_related("actor").order_by("-created_at", "-id")[: limit + 1])
+    next_cursor = encode_cursor(events[limit - 1]) if len(events) > limit else None
+    return events[:limit], next_cursor
+
+
+def backfill_activity(batch_size: int = 1000) -> int:
+    """Rebuild the feed from existing documents, chat messages and shipment updates."""
+    ActivityEvent.objects.all().delete()
+    written = 0
+    sources = [
+        (Document.objects.filter(linked_shipment__isnull=False).select_related("linked_shipment"), event_for_document),
+        (ChatMessage.objects.select_related("shipment"), event_for_chat),
+        (ShipmentUpdate.objects.select_related("shipment"), event_for_update),
+    ]
+    for queryset, build in sources:
+        batch = []
+        for instance in queryset.iterator(chunk_size=batch_size):
+            event = build(instance)
+            if event is not None:
+                batch.append(event)
+            if len(batch) >= batch_size:
+                written += len(ActivityEvent.objects.bulk_create(batch))
+                batch = []
+        written += len(ActivityEvent.objects.bulk_create(batch))
+    return written
@@ -0,0 +1,103 @@
+"""Evaluate alert rules in bulk and keep the Alert table in sync.
+
+Run on a schedule (``manage.py refresh_alerts``) for time-based rules and
+after relevant saves for the shipments they touch.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from logistics.models import ContainerShipment
+from .compliance import missing_doc_types
+from .models import Alert
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _desired_alerts(shipments) -> Dict[Tuple[int, str], dict]:
+    transit_days = int(_setting("ALERTS_TRANSIT_DAYS", 7))
+    required_docs = list(_setting("ALERTS_REQUIRED_DOC_TYPES", ["BL", "INVOICE"]))
+    late_before = timezone.now().date() - timedelta(days=transit_days)
+
+    desired = {}
+    rows = shipments.values_list(
+        "id", "container_no", "destination_site", "status", "created_at", "doc_compliance__doc_mask"
+    )
+    for sid, container_no, site, status, created_at, doc_mask in rows.iterator():
+        common = {"destination_site": site, "container_code": container_no or ""}
+        if status == "IN_TRANSIT" and created_at.date() < late_before:
+            desired[(sid, "LATE_TRANSIT")] = dict(
+                common,
+                level="critical",
+                title="Retard en transit",
+                message=f"En transit depuis plus de {transit_days} jours",
+            )
+        if not site:
+            desired[(sid, "MISSING_DESTINATION")] = dict(
+                common,
+                level="important",
+                title="Destination manquante",
+                message="Aucun site de destination",
+            )
+        missing = missing_doc_types(doc_mask or 0, required_docs)
+        if missing:
+            desired[(sid, "MISSING_DOCS")] = dict(
+                common,
+                level="important",
+                title="Documents manquants",
+                message=f"Manquants: {', '.join(missing)}",
+            )
+    return desired
+
+
+def evaluate_alerts(shipment_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """Re-evaluate every rule for the given shipments (default: all of them).
+
+    Alerts whose condition still holds keep their acknowledgement; alerts
+    whose condition cleared are deleted.
+    """
+    shipments = ContainerShipment.objects.all()
+    existing = Alert.objects.all()
+    if shipment_ids is not None:
+        shipment_ids = list(shipment_ids)
+        shipments = shipments.filter(pk__in=shipment_ids)
+        existing = existing.filter(shipment_id__in=shipment_ids)
+
+    desired = _desired_alerts(shipments)
+    fields = ("level", "title", "message", "destination_site", "container_code")
+    now = timezone.now()
+    with transaction.atomic():
+        current = {(a.shipment_id, a.rule): a for a in existing.select_for_update()}
+        to_update, stale = [], []
+        for key, alert in current.items():
+            wanted = desired.pop(key, None)
+            if wanted is None:
+                stale.append(alert.pk)
+            elif any(getattr(alert, f) != wanted[f] for f in fields):
+                for f in fields:
+                    setattr(alert, f, wanted[f])
+                alert.priority = Alert.LEVEL_PRIORITY[alert.level]
+                # auto_now only applies in save(), not in bulk_update().
+                alert.updated_at = now
+                to_update.append(alert)
+        Alert.objects.filter(pk__in=stale).delete()
+        Alert.objects.bulk_update(to_update, fields + ("priority", "updated_at"))
+        # A concurrent evaluation may have inserted the same (shipment, rule) since the
+        # select above; update that row instead of failing on the unique constraint.
+        Alert.objects.bulk_create(
+            [
+                Alert(shipment_id=sid, rule=rule, priority=Alert.LEVEL_PRIORITY[values["level"]], **values)
+                for (sid, rule), values in desired.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["shipment", "rule"],
+            update_fields=fields + ("priority", "updated_at"),
+        )
+    return {"created": len(desired), "updated": len(to_update), "deleted": len(stale)}
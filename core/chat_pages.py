@@ -0,0 +1,70 @@
+"""Latest-N and cursor pages of a shipment chat, oldest message first.
+
+Each page carries the message just before it (``previous``) so date
+separators and avatar grouping stay correct across page boundaries.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+
+from .pagination import decode_cursor, encode_cursor, newer_than, older_than
+
+
+@dataclass
+class ChatPage:
+    messages: List[Any]
+    previous: Optional[Any] = None
+    has_more: bool = False
+
+    @property
+    def first_cursor(self) -> Optional[str]:
+        return encode_cursor(self.messages[0]) if self.messages else None
+
+    @property
+    def last_cursor(self) -> Optional[str]:
+        return encode_cursor(self.messages[-1]) if self.messages else None
+
+
+def page_size() -> int:
+    return int(getattr(settings, "CHAT_PAGE_SIZE", 50))
+
+
+def _older_page(queryset: QuerySet, limit: int) -> ChatPage:
+    rows = list(queryset.order_by("-created_at", "-id")[: limit + 1])
+    has_more = len(rows) > limit
+    return ChatPage(messages=rows[:limit][::-1], previous=rows[limit] if has_more else None, has_more=has_more)
+
+
+def latest_messages(queryset: QuerySet, limit: Optional[int] = None) -> ChatPage:
+    return _older_page(queryset, limit or page_size())
+
+
+def messages_before(queryset: QuerySet, cursor: str, limit: Optional[int] = None) -> ChatPage:
+    """Messages older than ``cursor`` (scroll-back); ``has_more`` if even older ones exist."""
+    position = decode_cursor(cursor)
+    if position is None:
+        return ChatPage(messages=[])
+    return _older_page(queryset.filter(older_than(position)), limit or page_size())
+
+
+def messages_after(queryset: QuerySet, cursor: Optional[str], limit: Optional[int] = None) -> ChatPage:
+    """Messages newer than ``cursor`` (polling); the cursor message is returned as ``previous``.
+
+    Without a cursor the page starts at the first message of the chat.
+    """
+    limit = limit or page_size()
+    if not cursor:
+        rows = list(queryset.order_by("created_at", "id")[: limit + 1])
+        return ChatPage(messages=rows[:limit], has_more=len(rows) > limit)
+    position = decode_cursor(cursor)
+    if position is None:
+        return ChatPage(messages=[])
+    rows = list(
+        queryset.filter(newer_than(position) | Q(pk=position[1])).order_by("created_at", "id")[: limit + 2]
+    )
+    previous = rows.pop(0) if rows and rows[0].pk == position[1] else None
+    return ChatPage(messages=rows[:limit], previous=previous, has_more=len(rows) > limit)
@@ -0,0 +1,103 @@
+"""Per-shipment document compliance, kept in ShipmentDocCompliance.
+
+Each document type gets a fixed bit (its position in
+Document.DOC_TYPE_CHOICES), so masks stay valid when the required types
+change; only ``is_complete`` has to be recomputed then (rebuild_doc_compliance).
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.db.models import BooleanField, Case, F, Q, Value, When
+from django.db.models.lookups import GreaterThan
+
+from documents.models import Document
+from logistics.models import ContainerShipment
+from .models import ShipmentDocCompliance
+
+DOC_TYPE_BITS: Dict[str, int] = {code: 1 << i for i, (code, _) in enumerate(Document.DOC_TYPE_CHOICES)}
+
+
+def required_doc_types() -> List[str]:
+    return list(getattr(settings, "ALERTS_REQUIRED_DOC_TYPES", ["BL", "INVOICE"]))
+
+
+def mask_for(doc_types: Iterable[str]) -> int:
+    mask = 0
+    for doc_type in doc_types:
+        mask |= DOC_TYPE_BITS.get(doc_type, 0)
+    return mask
+
+
+def is_complete(mask: int, required: Optional[Sequence[str]] = None) -> bool:
+    required = required_doc_types() if required is None else required
+    return all(mask & DOC_TYPE_BITS.get(doc_type, 0) for doc_type in required)
+
+
+def missing_doc_types(mask: int, required: Optional[Sequence[str]] = None) -> List[str]:
+    required = required_doc_types() if required is None else required
+    return [doc_type for doc_type in required if not mask & DOC_TYPE_BITS.get(doc_type, 0)]
+
+
+def missing_docs_q(prefix: str = "") -> Q:
+    """Shipments (or rows related through ``prefix``) lacking a required document."""
+    return Q(**{f"{prefix}doc_compliance__is_complete": False}) | Q(**{f"{prefix}doc_compliance__isnull": True})
+
+
+def has_doc_type(doc_type: str, prefix: str = "") -> Case:
+    """Boolean expression: the shipment has at least one document of ``doc_type``."""
+    bit = DOC_TYPE_BITS.get(doc_type, 0)
+    bits = F(f"{prefix}doc_compliance__doc_mask").bitand(bit)
+    return Case(When(GreaterThan(bits, 0), then=Value(True)), default=Value(False), output_field=BooleanField())
+
+
+def _masks(shipment_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+    docs = Document.objects.filter(linked_shipment__isnull=False)
+    if shipment_ids is not None:
+        docs = docs.filter(linked_shipment_id__in=shipment_ids)
+    masks: Dict[int, int] = {}
+    for sid, doc_type in docs.values_list("linked_shipment_id", "doc_type").distinct().iterator():
+        masks[sid] = masks.get(sid, 0) | DOC_TYPE_BITS.get(doc_type, 0)
+    return masks
+
+
+def _upsert(shipment_ids: Iterable[int], masks: Dict[int, int]) -> int:
+    required = required_doc_types()
+    rows = [
+        ShipmentDocCompliance(shipment_id=sid, doc_mask=masks.get(sid, 0), is_complete=is_complete(masks.get(sid, 0), required))
+        for sid in shipment_ids
+    ]
+    ShipmentDocCompliance.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["shipment"],
+        update_fields=["doc_mask", "is_complete", "updated_at"],
+    )
+    return len(rows)
+
+
+def refresh_compliance(shipment_ids: Iterable[int]) -> int:
+    """Recompute the compliance rows of the given shipments from their documents."""
+    shipment_ids = [sid for sid in set(shipment_ids) if sid]
+    if not shipment_ids:
+        return 0
+    existing = list(ContainerShipment.objects.filter(pk__in=shipment_ids).values_list("pk", flat=True))
+    return _upsert(existing, _masks(existing))
+
+
+def rebuild_compliance() -> int:
+    """Recompute every shipment, e.g. after ALERTS_REQUIRED_DOC_TYPES changed."""
+    masks = _masks()
+    written = 0
+    ids = ContainerShipment.objects.values_list("pk", flat=True).order_by("pk")
+    batch: List[int] = []
+    for sid in ids.iterator(chunk_size=2000):
+        batch.append(sid)
+        if len(batch) >= 2000:
+            written += _upsert(batch, masks)
+            batch = []
+    if batch:
+        written += _upsert(batch, masks)
+    return written
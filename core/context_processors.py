@@ -1,5 +1,20 @@
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 
 
 def cloudinary_enabled(request):
     return {"cloudinary_enabled": bool(getattr(settings, "CLOUDINARY_ENABLED", False))}
+
+
+def chat_unread(request):
+    """Total unread chat messages for the navigation badge, computed only if a template uses it."""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+
+    def total():
+        from core.views import get_unread_counts
+
+        return sum(get_unread_counts(request).values())
+
+    return {"chat_unread_total": SimpleLazyObject(total)}
@@ -0,0 +1,45 @@
+"""Streaming CSV export of the dashboard shipment list."""
+from __future__ import annotations
+
+import csv
+from typing import Iterator
+
+from django.conf import settings
+from django.db.models import Count, QuerySet
+
+EXPORT_COLUMNS = ("container_no", "bl_no", "status", "destination_site", "client_name", "created_at")
+TOTALS_COLUMNS = ("items_count", "total_value")
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset: QuerySet, with_totals: bool = False) -> QuerySet:
+    """Plain value tuples, newest first; the item count comes from one GROUP BY.
+
+    ``total_value`` is the summary column kept current by core.summary.
+    """
+    columns = EXPORT_COLUMNS
+    if with_totals:
+        queryset = queryset.annotate(items_count=Count("items"))
+        columns = columns + TOTALS_COLUMNS
+    return queryset.order_by("-created_at", "-id").values_list(*columns)
+
+
+def iter_shipments_csv(queryset: QuerySet, with_totals: bool = False) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS + (TOTALS_COLUMNS if with_totals else ()))
+    chunk_size = getattr(settings, "DASHBOARD_EXPORT_CHUNK_SIZE", 2000)
+    for row in export_rows(queryset, with_totals).iterator(chunk_size=chunk_size):
+        container_no, bl_no, status, destination_site, client_name, created_at = row[:6]
+        yield writer.writerow([
+            container_no,
+            bl_no,
+            status,
+            destination_site or "",
+            client_name or "",
+            created_at.strftime("%Y-%m-%d %H:%M"),
+            *row[6:],
+        ])
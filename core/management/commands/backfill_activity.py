@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.activity import backfill_activity
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard activity feed from documents, chat messages and shipment updates"
+
+    def handle(self, *args, **options):
+        written = backfill_activity()
+        self.stdout.write(self.style.SUCCESS(f"{written} activity events written"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.compliance import rebuild_compliance
+
+
+class Command(BaseCommand):
+    help = "Recompute per-shipment document compliance (run after changing ALERTS_REQUIRED_DOC_TYPES)"
+
+    def handle(self, *args, **options):
+        written = rebuild_compliance()
+        self.stdout.write(self.style.SUCCESS(f"{written} shipments updated"))
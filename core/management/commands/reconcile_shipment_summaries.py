@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.summary import reconcile_summaries
+
+
+class Command(BaseCommand):
+    help = "Recompute last_update_at, docs_count, chat_count and total_value on every shipment"
+
+    def handle(self, *args, **options):
+        updated = reconcile_summaries()
+        self.stdout.write(self.style.SUCCESS(f"{updated} shipments reconciled"))
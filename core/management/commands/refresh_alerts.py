@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.alert_engine import evaluate_alerts
+
+
+class Command(BaseCommand):
+    help = "Re-evaluate alert rules for every shipment (schedule this for time-based rules)"
+
+    def handle(self, *args, **options):
+        counts = evaluate_alerts()
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['created']} created, {counts['updated']} updated, {counts['deleted']} deleted"
+        ))
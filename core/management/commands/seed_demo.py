@@ -3,6 +3,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from accounts.models import User
+from audit.buffer import audit_buffer
 from supply.models import Supplier, Product, PurchaseOrder, PurchaseOrderLine
 from logistics.models import ContainerShipment, ContainerItem, StatusHistory
 from documents.models import Document
@@ -13,6 +14,10 @@ class Command(BaseCommand):
     help = "Seed demo data"
 
     def handle(self, *args, **options):
+        with audit_buffer():
+            self._seed()
+
+    def _seed(self):
         if User.objects.exists():
             self.stdout.write(self.style.WARNING("Users already exist, skipping seed."))
             return
@@ -0,0 +1,76 @@
+"""Prometheus metrics exposed on /metrics.
+
+Requires the prometheus_client package and METRICS_ENABLED; otherwise every
+helper is a no-op. Under gunicorn, PROMETHEUS_MULTIPROC_DIR (set by
+gunicorn.conf.py) makes each worker write its samples to a shared directory
+that the exposition aggregates, whichever worker serves the scrape.
+"""
+from __future__ import annotations
+
+import os
+from typing import Tuple
+
+from django.conf import settings
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+ENABLED = prometheus_client is not None and getattr(settings, "METRICS_ENABLED", True)
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+if ENABLED:
+    REQUEST_LATENCY = prometheus_client.Histogram(
+        "fagouflow_request_duration_seconds", "Request latency by URL name", ["view", "method"]
+    )
+    RESPONSES = prometheus_client.Counter(
+        "fagouflow_responses_total", "Responses by URL name and status code", ["view", "method", "status"]
+    )
+    DB_QUERIES = prometheus_client.Histogram(
+        "fagouflow_request_db_queries", "SQL statements per request", ["view"], buckets=QUERY_COUNT_BUCKETS
+    )
+    DB_TIME = prometheus_client.Histogram(
+        "fagouflow_request_db_seconds", "Total SQL time per request", ["view"]
+    )
+    CACHE_REQUESTS = prometheus_client.Counter(
+        "fagouflow_cache_requests_total", "Cache lookups by cache and result", ["cache", "result"]
+    )
+    AUDIT_FLUSH_EVENTS = prometheus_client.Histogram(
+        "fagouflow_audit_flush_events", "Audit events written per flush", buckets=QUERY_COUNT_BUCKETS
+    )
+    AUDIT_FLUSH_TIME = prometheus_client.Histogram(
+        "fagouflow_audit_flush_seconds", "Time spent writing one audit flush"
+    )
+
+
+def observe_request(view: str, method: str, status: int, seconds: float, sql_count: int, sql_seconds: float) -> None:
+    if not ENABLED:
+        return
+    REQUEST_LATENCY.labels(view, method).observe(seconds)
+    RESPONSES.labels(view, method, str(status)).inc()
+    DB_QUERIES.labels(view).observe(sql_count)
+    DB_TIME.labels(view).observe(sql_seconds)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    if ENABLED:
+        CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observe_audit_flush(events: int, seconds: float) -> None:
+    if ENABLED:
+        AUDIT_FLUSH_EVENTS.observe(events)
+        AUDIT_FLUSH_TIME.observe(seconds)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition body and content type, aggregated across workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import json
+import logging
 import threading
+from contextlib import ExitStack
 from typing import Optional
 
+from django.conf import settings
 from django.contrib import messages
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.http import HttpRequest
 from django.shortcuts import redirect
 
+from . import metrics
+from .timing import RequestTimings, get_current_timings, install_template_timing, record_sql, set_current_timings
+
 _thread_locals = threading.local()
+slow_request_logger = logging.getLogger("core.slow_requests")
 
 
 def set_current_request(request: Optional[HttpRequest]) -> None:
@@ -54,6 +64,87 @@ class ThreadLocalRequestMiddleware:
         return response
 
 
+def _timed_response(get_response, request: HttpRequest, timings: RequestTimings):
+    set_current_timings(timings)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(record_sql))
+            return get_response(request)
+    finally:
+        set_current_timings(None)
+
+
+class RequestTimingMiddleware:
+    """Measure wall time, SQL and template time of each request.
+
+    Staff users get the figures in a ``Server-Timing`` header; requests over
+    SLOW_REQUEST_MS are logged with their slowest SQL statements. Removed
+    from the chain entirely when REQUEST_TIMING_ENABLED is off.
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_TIMING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "SLOW_REQUEST_MS", 1000)
+        self.top_n = getattr(settings, "SLOW_REQUEST_TOP_SQL", 5)
+        install_template_timing()
+
+    def __call__(self, request: HttpRequest):
+        timings = RequestTimings(top_n=self.top_n)
+        response = _timed_response(self.get_response, request, timings)
+
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated and user.is_staff:
+            response["Server-Timing"] = timings.server_timing()
+        elapsed_ms = timings.elapsed() * 1000
+        if elapsed_ms >= self.slow_ms:
+            slow_request_logger.warning(json.dumps({
+                "event": "slow_request",
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "user_id": getattr(user, "pk", None),
+                "total_ms": round(elapsed_ms, 1),
+                "sql_count": timings.sql_count,
+                "sql_ms": round(timings.sql_seconds * 1000, 1),
+                "template_ms": round(timings.template_seconds * 1000, 1),
+                "slowest_sql": timings.slowest_queries(),
+            }))
+        return response
+
+
+class MetricsMiddleware:
+    """Feed request latency, status and SQL figures to the Prometheus metrics.
+
+    Reuses the RequestTimingMiddleware figures when it runs outside this one;
+    removed from the chain when metrics are disabled.
+    """
+    def __init__(self, get_response):
+        if not metrics.ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        timings = get_current_timings()
+        if timings is not None:
+            response = self.get_response(request)
+        else:
+            timings = RequestTimings(top_n=0)
+            response = _timed_response(self.get_response, request, timings)
+
+        match = getattr(request, "resolver_match", None)
+        metrics.observe_request(
+            match.view_name if match is not None else "<unmatched>",
+            request.method,
+            response.status_code,
+            timings.elapsed(),
+            timings.sql_count,
+            timings.sql_seconds,
+        )
+        return response
+
+
 class AdminStaffOnlyMiddleware:
     """Redirect non-staff users away from /admin/."""
     def __init__(self, get_response):
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_client_preview_only"),
+        ("logistics", "0002_containershipment_client"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("DOCUMENT", "Document"), ("CHAT", "Chat"), ("UPDATE", "Update")], max_length=20)),
+                ("destination_site", models.CharField(blank=True, max_length=10, null=True)),
+                ("container_code", models.CharField(blank=True, max_length=100)),
+                ("action", models.CharField(max_length=255)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("actor", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ("shipment", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="activity_events", to="logistics.containershipment")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["destination_site", "created_at"], name="activity_site_created_idx"), models.Index(fields=["created_at", "id"], name="activity_created_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_activityevent"),
+        ("logistics", "0002_containershipment_client"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Alert",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("rule", models.CharField(choices=[("LATE_TRANSIT", "Late in transit"), ("MISSING_DESTINATION", "Missing destination"), ("MISSING_DOCS", "Missing documents")], max_length=30)),
+                ("level", models.CharField(choices=[("critical", "Critical"), ("important", "Important"), ("info", "Info")], max_length=20)),
+                ("priority", models.PositiveSmallIntegerField()),
+                ("title", models.CharField(max_length=200)),
+                ("message", models.CharField(blank=True, max_length=255)),
+                ("destination_site", models.CharField(blank=True, max_length=10, null=True)),
+                ("container_code", models.CharField(blank=True, max_length=100)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("acknowledged_at", models.DateTimeField(blank=True, null=True)),
+                ("acknowledged_by", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ("shipment", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="alerts", to="logistics.containershipment")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["destination_site", "priority", "created_at"], name="alert_site_priority_idx"), models.Index(fields=["priority", "created_at"], name="alert_priority_idx")],
+                "constraints": [models.UniqueConstraint(fields=("shipment", "rule"), name="unique_shipment_alert_rule")],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_alert"),
+        ("logistics", "0002_containershipment_client"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShipmentDocCompliance",
+            fields=[
+                ("shipment", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="doc_compliance", serialize=False, to="logistics.containershipment")),
+                ("doc_mask", models.PositiveIntegerField(default=0)),
+                ("is_complete", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["is_complete"], name="doc_compliance_complete_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def backfill_doc_compliance(apps, schema_editor):
+    """Create the compliance row of every existing shipment (same rules as core.compliance)."""
+    ContainerShipment = apps.get_model("logistics", "ContainerShipment")
+    Document = apps.get_model("documents", "Document")
+    ShipmentDocCompliance = apps.get_model("core", "ShipmentDocCompliance")
+
+    choices = Document._meta.get_field("doc_type").choices
+    bits = {code: 1 << i for i, (code, _) in enumerate(choices)}
+    required = list(getattr(settings, "ALERTS_REQUIRED_DOC_TYPES", ["BL", "INVOICE"]))
+
+    masks = {}
+    docs = Document.objects.filter(linked_shipment__isnull=False).values_list("linked_shipment_id", "doc_type")
+    for sid, doc_type in docs.distinct().iterator():
+        masks[sid] = masks.get(sid, 0) | bits.get(doc_type, 0)
+
+    existing = set(ShipmentDocCompliance.objects.values_list("shipment_id", flat=True))
+    rows = []
+    for sid in ContainerShipment.objects.values_list("pk", flat=True).iterator():
+        if sid in existing:
+            continue
+        mask = masks.get(sid, 0)
+        complete = all(mask & bits.get(doc_type, 0) for doc_type in required)
+        rows.append(ShipmentDocCompliance(shipment_id=sid, doc_mask=mask, is_complete=complete))
+    ShipmentDocCompliance.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_shipmentdoccompliance"),
+        ("documents", "0007_document_description"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_doc_compliance, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_shipment_summaries(apps, schema_editor):
+    """Fill the summary columns of existing shipments (same expressions as core.summary)."""
+    ContainerShipment = apps.get_model("logistics", "ContainerShipment")
+    ContainerItem = apps.get_model("logistics", "ContainerItem")
+    ShipmentUpdate = apps.get_model("core", "ShipmentUpdate")
+    Document = apps.get_model("documents", "Document")
+    ChatMessage = apps.get_model("chat", "ChatMessage")
+    value_field = models.DecimalField(max_digits=14, decimal_places=2)
+
+    def count(model, fk):
+        rows = model.objects.filter(**{fk: OuterRef("pk")}).order_by().values(fk).annotate(n=Count("pk")).values("n")
+        return Coalesce(Subquery(rows[:1], output_field=models.IntegerField()), 0)
+
+    items_value = (
+        ContainerItem.objects.filter(shipment=OuterRef("pk"))
+        .order_by()
+        .values("shipment")
+        .annotate(v=Sum(F("qty") * F("unit_price"), output_field=value_field))
+        .values("v")
+    )
+    ContainerShipment.objects.update(
+        last_update_at=Subquery(
+            ShipmentUpdate.objects.filter(shipment=OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+        ),
+        docs_count=count(Document, "linked_shipment"),
+        chat_count=count(ChatMessage, "shipment"),
+        total_value=Coalesce(
+            Subquery(items_value[:1], output_field=value_field), Value(Decimal("0")), output_field=value_field
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_backfill_doc_compliance"),
+        ("logistics", "0004_containershipment_summary"),
+        ("chat", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_shipment_summaries, migrations.RunPython.noop),
+    ]
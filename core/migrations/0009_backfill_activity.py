@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+def backfill_activity(apps, schema_editor):
+    """Build the feed from existing documents, chat messages and updates (same rows as core.activity)."""
+    ActivityEvent = apps.get_model("core", "ActivityEvent")
+    ShipmentUpdate = apps.get_model("core", "ShipmentUpdate")
+    Document = apps.get_model("documents", "Document")
+    ChatMessage = apps.get_model("chat", "ChatMessage")
+
+    def document(doc):
+        action = f"a ajouté un document {doc.doc_type} (v{doc.version})"
+        return doc.linked_shipment, doc.uploaded_by_id, action, doc.uploaded_at
+
+    def chat(message):
+        return message.shipment, message.author_id, "a envoyé un message", message.created_at
+
+    def update(row):
+        return row.shipment, row.created_by_id, f"statut mis à jour: {row.status}", row.created_at
+
+    documents = Document.objects.filter(linked_shipment__isnull=False).select_related("linked_shipment")
+    sources = [
+        ("DOCUMENT", documents, document),
+        ("CHAT", ChatMessage.objects.select_related("shipment"), chat),
+        ("UPDATE", ShipmentUpdate.objects.select_related("shipment"), update),
+    ]
+    ActivityEvent.objects.all().delete()
+    for kind, queryset, describe in sources:
+        batch = []
+        for instance in queryset.iterator(chunk_size=1000):
+            shipment, actor_id, action, created_at = describe(instance)
+            batch.append(ActivityEvent(
+                kind=kind,
+                shipment_id=shipment.pk,
+                destination_site=shipment.destination_site,
+                container_code=shipment.container_no or "",
+                actor_id=actor_id,
+                action=action,
+                created_at=created_at,
+            ))
+            if len(batch) >= 1000:
+                ActivityEvent.objects.bulk_create(batch)
+                batch = []
+        ActivityEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_backfill_shipment_summaries"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 from logistics.models import ContainerShipment
 
@@ -35,3 +36,103 @@ class Client(models.Model):
 
     def __str__(self) -> str:
         return self.name or self.email or f"Client #{self.pk}"
+
+
+class ActivityEvent(models.Model):
+    """Append-only feed entry shown in the dashboard "Activité récente" block."""
+
+    KIND_CHOICES = [
+        ("DOCUMENT", "Document"),
+        ("CHAT", "Chat"),
+        ("UPDATE", "Update"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    shipment = models.ForeignKey(
+        ContainerShipment, on_delete=models.CASCADE, related_name="activity_events"
+    )
+    # Denormalized from the shipment so the feed is a single index range scan.
+    destination_site = models.CharField(max_length=10, null=True, blank=True)
+    container_code = models.CharField(max_length=100, blank=True)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    action = models.CharField(max_length=255)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["destination_site", "created_at"], name="activity_site_created_idx"),
+            models.Index(fields=["created_at", "id"], name="activity_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.container_code} {self.action}"
+
+
+class Alert(models.Model):
+    """Alert precomputed by core.alert_engine for one shipment and rule."""
+
+    RULE_CHOICES = [
+        ("LATE_TRANSIT", "Late in transit"),
+        ("MISSING_DESTINATION", "Missing destination"),
+        ("MISSING_DOCS", "Missing documents"),
+    ]
+    LEVEL_CHOICES = [
+        ("critical", "Critical"),
+        ("important", "Important"),
+        ("info", "Info"),
+    ]
+    LEVEL_PRIORITY = {"critical": 0, "important": 1, "info": 2}
+
+    shipment = models.ForeignKey(
+        ContainerShipment, on_delete=models.CASCADE, related_name="alerts"
+    )
+    rule = models.CharField(max_length=30, choices=RULE_CHOICES)
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES)
+    priority = models.PositiveSmallIntegerField()
+    title = models.CharField(max_length=200)
+    message = models.CharField(max_length=255, blank=True)
+    destination_site = models.CharField(max_length=10, null=True, blank=True)
+    container_code = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    acknowledged_at = models.DateTimeField(null=True, blank=True)
+    acknowledged_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["shipment", "rule"], name="unique_shipment_alert_rule"),
+        ]
+        indexes = [
+            models.Index(fields=["destination_site", "priority", "created_at"], name="alert_site_priority_idx"),
+            models.Index(fields=["priority", "created_at"], name="alert_priority_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.container_code} {self.title}"
+
+
+class ShipmentDocCompliance(models.Model):
+    """Document types present on a shipment, maintained by core.compliance.
+
+    ``doc_mask`` has one bit per Document.DOC_TYPE_CHOICES entry;
+    ``is_complete`` is true when every ALERTS_REQUIRED_DOC_TYPES bit is set.
+    """
+
+    shipment = models.OneToOneField(
+        ContainerShipment, on_delete=models.CASCADE, primary_key=True, related_name="doc_compliance"
+    )
+    doc_mask = models.PositiveIntegerField(default=0)
+    is_complete = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_complete"], name="doc_compliance_complete_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.shipment_id}: {self.doc_mask:b}"
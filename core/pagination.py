@@ -0,0 +1,152 @@
+"""Keyset pagination on (created_at, id) with bounded or estimated counts."""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(obj) -> str:
+    return f"{obj.created_at.isoformat()}|{obj.pk}"
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    try:
+        created_at, pk = cursor.rsplit("|", 1)
+        parsed = parse_datetime(created_at)
+        return (parsed, int(pk)) if parsed else None
+    except (AttributeError, ValueError):
+        return None
+
+
+def older_than(position: Tuple[datetime, int]) -> Q:
+    created_at, pk = position
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+
+
+def newer_than(position: Tuple[datetime, int]) -> Q:
+    created_at, pk = position
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """Planner row estimate on PostgreSQL, None elsewhere."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_AT_LEAST = "at_least"
+
+
+def bounded_count(queryset: QuerySet, threshold: Optional[int] = None) -> Tuple[int, str]:
+    """Exact count up to ``threshold``, then the planner estimate.
+
+    Returns (count, kind). ``kind`` is COUNT_AT_LEAST when there is no estimate
+    above the threshold, so the total is only known to exceed ``threshold``.
+    """
+    if threshold is None:
+        threshold = int(getattr(settings, "LIST_COUNT_THRESHOLD", 1000))
+    count = queryset.order_by()[: threshold + 1].count()
+    if count <= threshold:
+        return count, COUNT_EXACT
+    estimate = estimate_count(queryset)
+    if estimate is None or estimate <= threshold:
+        return threshold, COUNT_AT_LEAST
+    return estimate, COUNT_ESTIMATE
+
+
+@dataclass
+class KeysetPage:
+    object_list: List[Any]
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+    count: int = 0
+    count_kind: str = COUNT_EXACT
+    next_query: str = ""
+    previous_query: str = ""
+
+    @property
+    def count_is_approximate(self) -> bool:
+        return self.count_kind == COUNT_ESTIMATE
+
+    @property
+    def count_is_lower_bound(self) -> bool:
+        return self.count_kind == COUNT_AT_LEAST
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+
+def _query_with(params, key: str, cursor: Optional[str]) -> str:
+    if cursor is None:
+        return ""
+    query = params.copy()
+    query.pop("after", None)
+    query.pop("before", None)
+    query[key] = cursor
+    return query.urlencode()
+
+
+def keyset_page(queryset: QuerySet, request_params, per_page: int = 20, with_count: bool = True) -> KeysetPage:
+    """Newest-first page selected by ``?after=<cursor>`` or ``?before=<cursor>``.
+
+    ``request_params`` is the request's QueryDict; other parameters (filters)
+    are carried over into ``next_query``/``previous_query``.
+    """
+    after = decode_cursor(request_params.get("after") or "")
+    before = None if after else decode_cursor(request_params.get("before") or "")
+    if before:
+        rows = list(queryset.filter(newer_than(before)).order_by("created_at", "id")[: per_page + 1])
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_next = True
+    else:
+        if after:
+            queryset_page = queryset.filter(older_than(after))
+        else:
+            queryset_page = queryset
+        rows = list(queryset_page.order_by("-created_at", "-id")[: per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = after is not None
+    page = KeysetPage(
+        object_list=rows,
+        next_cursor=encode_cursor(rows[-1]) if has_next and rows else None,
+        previous_cursor=encode_cursor(rows[0]) if has_previous and rows else None,
+    )
+    page.next_query = _query_with(request_params, "after", page.next_cursor)
+    page.previous_query = _query_with(request_params, "before", page.previous_cursor)
+    if with_count:
+        page.count, page.count_kind = bounded_count(queryset)
+    return page
@@ -0,0 +1,144 @@
+"""Publish/subscribe for live chat delivery.
+
+Uses Redis pub/sub when REALTIME_BACKEND is "redis" and the redis package
+is installed, so every web process sees every message; otherwise an
+in-process broker, which is enough for a single process (runserver, tests).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+from typing import Dict, Optional, Set
+
+from django.conf import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+def chat_channel(kind: str, shipment_id: int) -> str:
+    """``kind`` is "team" (ChatMessage) or "client" (ClientChatMessage)."""
+    return f"chat:{kind}:{shipment_id}"
+
+
+class InProcessSubscription:
+    def __init__(self, broker: "InProcessBroker", channel: str):
+        self.broker = broker
+        self.channel = channel
+        self.queue: "queue.Queue[dict]" = queue.Queue()
+
+    def get(self, timeout: float) -> Optional[dict]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.broker._unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[InProcessSubscription]] = {}
+
+    def publish(self, channel: str, message: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.queue.put(message)
+
+    def subscribe(self, channel: str) -> InProcessSubscription:
+        subscription = InProcessSubscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: InProcessSubscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+
+class RedisSubscription:
+    def __init__(self, client, channel: str):
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+
+    def get(self, timeout: float) -> Optional[dict]:
+        message = self.pubsub.get_message(timeout=timeout)
+        if not message or message.get("type") != "message":
+            return None
+        return json.loads(message["data"])
+
+    def close(self) -> None:
+        self.pubsub.close()
+
+
+class RedisBroker:
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel: str, message: dict) -> None:
+        try:
+            self.client.publish(channel, json.dumps(message))
+        except redis.RedisError:
+            logger.warning("realtime publish to %s failed", channel, exc_info=True)
+
+    def subscribe(self, channel: str) -> RedisSubscription:
+        return RedisSubscription(self.client, channel)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = _make_broker()
+    return _broker
+
+
+def _make_broker():
+    backend = getattr(settings, "REALTIME_BACKEND", "memory")
+    if backend == "redis":
+        if redis is not None:
+            return RedisBroker(settings.REDIS_URL)
+        logger.warning("REALTIME_BACKEND=redis but the redis package is missing; using the in-process broker")
+    return InProcessBroker()
+
+
+def publish(channel: str, message: dict) -> None:
+    get_broker().publish(channel, message)
+
+
+_open_streams = 0
+_streams_lock = threading.Lock()
+
+
+def acquire_stream_slot() -> bool:
+    """Reserve one of this process's SSE_MAX_STREAMS stream slots; False when all are taken."""
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= getattr(settings, "SSE_MAX_STREAMS", 8):
+            return False
+        _open_streams += 1
+        return True
+
+
+def release_stream_slot() -> None:
+    global _open_streams
+    with _streams_lock:
+        _open_streams -= 1
@@ -0,0 +1,87 @@
+"""Database-side risk scoring for the direction dashboard."""
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, List, Sequence
+
+from django.conf import settings
+from django.db.models import BooleanField, Case, Count, Q, QuerySet, Value, When
+
+from .compliance import has_doc_type, missing_docs_q
+
+DEFAULT_RISK_WEIGHTS = {
+    "missing_destination": 2,
+    "missing_docs": 2,
+    "in_transit": 1,
+    "eta_overdue": 1,
+}
+
+RISK_REASONS = {
+    "missing_destination": "Destination manquante",
+    "missing_docs": "Docs manquants",
+    "in_transit": "En transit",
+    "eta_overdue": "ETA depassee",
+}
+
+
+def risk_weights() -> Dict[str, int]:
+    weights = dict(DEFAULT_RISK_WEIGHTS)
+    weights.update(getattr(settings, "DIRECTION_RISK_WEIGHTS", {}) or {})
+    return weights
+
+
+def doc_flag(doc_type: str) -> str:
+    return f"has_doc_{doc_type.lower()}"
+
+
+def annotate_doc_flags(qs: QuerySet, doc_types: Sequence[str]) -> QuerySet:
+    """Add one boolean ``has_doc_<type>`` annotation per document type, read from the compliance mask."""
+    return qs.annotate(**{doc_flag(doc_type): has_doc_type(doc_type) for doc_type in doc_types})
+
+
+def annotate_risk(qs: QuerySet, required_docs: Sequence[str], today: date) -> QuerySet:
+    """Annotate each rule as a boolean ``risk_<rule>`` plus the weighted ``risk_score``."""
+    weights = risk_weights()
+    qs = annotate_doc_flags(qs, required_docs)
+    conditions = {
+        "missing_destination": Q(destination_site__isnull=True) | Q(destination_site=""),
+        "missing_docs": missing_docs_q() if required_docs else None,
+        "in_transit": Q(status="IN_TRANSIT"),
+        "eta_overdue": Q(eta__lt=today),
+    }
+    flags = {}
+    score = Value(0)
+    for rule, condition in conditions.items():
+        if condition is None:
+            flags[f"risk_{rule}"] = Value(False, output_field=BooleanField())
+            continue
+        flags[f"risk_{rule}"] = Case(When(condition, then=Value(True)), default=Value(False), output_field=BooleanField())
+        score = score + Case(When(condition, then=Value(int(weights.get(rule, 0)))), default=Value(0))
+    return qs.annotate(**flags).annotate(risk_score=score)
+
+
+def risk_reasons(shipment) -> str:
+    weights = risk_weights()
+    return ", ".join(
+        label for rule, label in RISK_REASONS.items()
+        if weights.get(rule) and getattr(shipment, f"risk_{rule}", False)
+    )
+
+
+def top_risks(qs: QuerySet, limit: int) -> List[dict]:
+    items = []
+    for s in qs.filter(risk_score__gt=0).order_by("-risk_score", "-created_at", "-id")[:limit]:
+        items.append({"shipment": s, "score": s.risk_score, "reasons": risk_reasons(s)})
+    return items
+
+
+def risk_summary(qs: QuerySet, required_docs: Sequence[str]) -> Dict[str, int]:
+    """Count active, at-risk, missing-docs and per-type documented shipments in one query."""
+    aggregates = {
+        "total": Count("pk"),
+        "at_risk": Count("pk", filter=Q(risk_score__gt=0)),
+        "missing_docs": Count("pk", filter=Q(risk_missing_docs=True)),
+    }
+    for doc_type in required_docs:
+        aggregates[f"with_{doc_flag(doc_type)}"] = Count("pk", filter=Q(**{doc_flag(doc_type): True}))
+    return qs.aggregate(**aggregates)
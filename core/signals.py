@@ -0,0 +1,158 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from chat.models import ChatMessage, ChatReadCursor, ClientChatMessage
+from documents.models import Document
+from logistics.models import ContainerItem, ContainerShipment
+from .activity import event_for_chat, event_for_document, event_for_update
+from .alert_engine import evaluate_alerts
+from .compliance import refresh_compliance
+from .models import ActivityEvent, ShipmentUpdate
+from .pagination import encode_cursor
+from .realtime import chat_channel, publish
+from .stats import invalidate_shipment_stats
+from .summary import add_chat_message, refresh_summaries, touch_last_update
+
+
+@receiver(post_save, sender=ContainerShipment)
+@receiver(post_delete, sender=ContainerShipment)
+def shipment_stats_changed(sender, instance, **kwargs):
+    invalidate_shipment_stats()
+
+
+def _record_activity(event):
+    if event is not None:
+        event.save()
+
+
+@receiver(post_save, sender=Document)
+def document_activity(sender, instance, created, **kwargs):
+    if created and instance.linked_shipment_id:
+        _record_activity(event_for_document(instance))
+
+
+@receiver(post_save, sender=ChatMessage)
+def chat_activity(sender, instance, created, **kwargs):
+    if created:
+        _record_activity(event_for_chat(instance))
+
+
+def _publish_chat(kind, message):
+    payload = {"id": message.pk, "cursor": encode_cursor(message)}
+    transaction.on_commit(partial(publish, chat_channel(kind, message.shipment_id), payload))
+
+
+@receiver(post_save, sender=ChatMessage)
+def publish_team_chat(sender, instance, created, **kwargs):
+    if created:
+        _publish_chat(ChatReadCursor.CHANNEL_TEAM, instance)
+
+
+@receiver(post_save, sender=ClientChatMessage)
+def publish_client_chat(sender, instance, created, **kwargs):
+    if created:
+        _publish_chat(ChatReadCursor.CHANNEL_CLIENT, instance)
+
+
+@receiver(post_save, sender=ShipmentUpdate)
+def update_activity(sender, instance, created, **kwargs):
+    if created:
+        _record_activity(event_for_update(instance))
+
+
+ACTIVITY_SHIPMENT_FIELDS = ("destination_site", "container_no")
+_UNKNOWN = object()
+
+
+@receiver(pre_save, sender=ContainerShipment)
+def remember_activity_shipment_fields(sender, instance, **kwargs):
+    # An instance not loaded through the ORM has no known state and is always synced.
+    instance._previous_activity_fields = tuple(
+        instance.loaded_value(name, _UNKNOWN) for name in ACTIVITY_SHIPMENT_FIELDS
+    )
+
+
+@receiver(post_save, sender=ContainerShipment)
+def sync_activity_shipment_fields(sender, instance, created, **kwargs):
+    if created:
+        return
+    current = tuple(getattr(instance, name) for name in ACTIVITY_SHIPMENT_FIELDS)
+    if getattr(instance, "_previous_activity_fields", None) == current:
+        return
+    ActivityEvent.objects.filter(shipment=instance).exclude(
+        destination_site=instance.destination_site, container_code=instance.container_no or ""
+    ).update(destination_site=instance.destination_site, container_code=instance.container_no or "")
+
+
+@receiver(pre_save, sender=Document)
+def remember_document_shipment(sender, instance, **kwargs):
+    instance._previous_shipment_id = instance.loaded_value("linked_shipment_id")
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def document_compliance(sender, instance, **kwargs):
+    refresh_compliance([instance.linked_shipment_id, getattr(instance, "_previous_shipment_id", None)])
+
+
+@receiver(post_save, sender=ContainerShipment)
+def shipment_compliance(sender, instance, created, **kwargs):
+    if created:
+        refresh_compliance([instance.pk])
+
+
+def _refresh_alerts(shipment_id):
+    if shipment_id:
+        transaction.on_commit(partial(evaluate_alerts, [shipment_id]))
+
+
+@receiver(post_save, sender=ContainerShipment)
+def shipment_alerts(sender, instance, **kwargs):
+    _refresh_alerts(instance.pk)
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def document_alerts(sender, instance, **kwargs):
+    _refresh_alerts(instance.linked_shipment_id)
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def document_summary(sender, instance, **kwargs):
+    refresh_summaries(
+        [instance.linked_shipment_id, getattr(instance, "_previous_shipment_id", None)], fields=["docs_count"]
+    )
+
+
+@receiver(post_save, sender=ChatMessage)
+def chat_summary_added(sender, instance, created, **kwargs):
+    if created:
+        add_chat_message(instance.shipment_id, 1)
+
+
+@receiver(post_delete, sender=ChatMessage)
+def chat_summary_removed(sender, instance, **kwargs):
+    add_chat_message(instance.shipment_id, -1)
+
+
+@receiver(post_save, sender=ShipmentUpdate)
+def update_summary_added(sender, instance, created, **kwargs):
+    if created:
+        touch_last_update(instance.shipment_id, instance.created_at)
+
+
+@receiver(post_delete, sender=ShipmentUpdate)
+def update_summary_removed(sender, instance, **kwargs):
+    refresh_summaries([instance.shipment_id], fields=["last_update_at"])
+
+
+@receiver(post_save, sender=ContainerItem)
+@receiver(post_delete, sender=ContainerItem)
+def item_summary(sender, instance, **kwargs):
+    # The stats read total_value, so invalidate only once it is refreshed.
+    refresh_summaries([instance.shipment_id], fields=["total_value"])
+    invalidate_shipment_stats()
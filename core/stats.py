@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .metrics import record_cache
+
+
+VERSION_KEY = "shipment_stats:version"
+
+
+@dataclass
+class ShipmentStats:
+    total: int = 0
+    in_transit: int = 0
+    delivered: int = 0
+    late: int = 0
+    blocked: int = 0
+    total_value: Optional[Decimal] = None
+
+
+def compute_shipment_stats(queryset) -> ShipmentStats:
+    """All shipment KPI counters and the value total in one aggregate query.
+
+    The value comes from the ``total_value`` summary column, so no item join is needed.
+    """
+    today = timezone.now().date()
+    row = queryset.order_by().aggregate(
+        total=Count("id"),
+        in_transit=Count("id", filter=Q(status="IN_TRANSIT")),
+        delivered=Count("id", filter=Q(status="DELIVERED")),
+        late=Count("id", filter=Q(status="IN_TRANSIT", eta__lt=today)),
+        blocked=Count("id", filter=Q(status__in=["EN_DOUANE", "BLOCKED"])),
+        total_value=Sum("total_value"),
+    )
+    return ShipmentStats(**row)
+
+
+def _new_version() -> int:
+    # Never reuse a version number if the counter was evicted.
+    return time.time_ns()
+
+
+def _version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_version(), None)
+        version = cache.get(VERSION_KEY, 0)
+    return version
+
+
+def get_shipment_stats(scope: str, queryset) -> ShipmentStats:
+    """Cached ShipmentStats for a scope ("global", "site:PN", "client:3", ...).
+
+    ``queryset`` must be the shipments of that scope; it is only evaluated
+    on a cache miss.
+    """
+    key = f"shipment_stats:{_version()}:{timezone.now().date().isoformat()}:{scope}"
+    stats = cache.get(key)
+    record_cache("shipment_stats", stats is not None)
+    if stats is None:
+        stats = compute_shipment_stats(queryset)
+        cache.set(key, stats, getattr(settings, "SHIPMENT_STATS_CACHE_TTL", 60))
+    return stats
+
+
+def invalidate_shipment_stats() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, _new_version(), None)
@@ -0,0 +1,80 @@
+"""Summary columns on ContainerShipment (last_update_at, docs_count, chat_count, total_value).
+
+Write paths keep them current through core.signals with single UPDATE
+statements; reconcile_summaries recomputes them from the source tables.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Optional, Sequence
+
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from chat.models import ChatMessage
+from documents.models import Document
+from logistics.models import ContainerItem, ContainerShipment
+from .models import ShipmentUpdate
+
+VALUE_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _count(queryset, fk: str):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{fk: OuterRef("pk")}).order_by().values(fk).annotate(n=Count("pk")).values("n")[:1],
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def summary_expressions():
+    return {
+        "last_update_at": Subquery(
+            ShipmentUpdate.objects.filter(shipment=OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+        ),
+        "docs_count": _count(Document.objects.all(), "linked_shipment"),
+        "chat_count": _count(ChatMessage.objects.all(), "shipment"),
+        "total_value": Coalesce(
+            Subquery(
+                ContainerItem.objects.filter(shipment=OuterRef("pk"))
+                .order_by()
+                .values("shipment")
+                .annotate(v=Sum(F("qty") * F("unit_price"), output_field=VALUE_FIELD))
+                .values("v")[:1],
+                output_field=VALUE_FIELD,
+            ),
+            Value(Decimal("0")),
+            output_field=VALUE_FIELD,
+        ),
+    }
+
+
+def refresh_summaries(shipment_ids: Optional[Iterable[int]] = None, fields: Optional[Sequence[str]] = None) -> int:
+    """Recompute ``fields`` (default: all) for the given shipments (default: all) in one UPDATE."""
+    expressions = summary_expressions()
+    if fields is not None:
+        expressions = {name: expressions[name] for name in fields}
+    shipments = ContainerShipment.objects.all()
+    if shipment_ids is not None:
+        shipment_ids = [sid for sid in set(shipment_ids) if sid]
+        if not shipment_ids:
+            return 0
+        shipments = shipments.filter(pk__in=shipment_ids)
+    return shipments.update(**expressions)
+
+
+def add_chat_message(shipment_id: int, delta: int) -> None:
+    ContainerShipment.objects.filter(pk=shipment_id).update(chat_count=Greatest(F("chat_count") + delta, 0))
+
+
+def touch_last_update(shipment_id: int, at: datetime) -> None:
+    ContainerShipment.objects.filter(pk=shipment_id).filter(
+        Q(last_update_at__isnull=True) | Q(last_update_at__lt=at)
+    ).update(last_update_at=at)
+
+
+def reconcile_summaries() -> int:
+    return refresh_summaries()
@@ -0,0 +1,55 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from chat.models import ChatMessage
+from core.models import ActivityEvent, ShipmentUpdate
+from tests.factories import make_shipment
+
+
+class ActivityFeedTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.agent = User.objects.create_user(
+            email="agent@example.com", password="pass1234", full_name="Agent", role="BRANCH_AGENT", site="PN"
+        )
+        self.pn = make_shipment("C001", "PN", "IN_TRANSIT")
+        self.kin = make_shipment("C002", "KIN", "IN_TRANSIT")
+
+    def test_events_written_on_create_and_scoped_by_site(self):
+        for i in range(17):
+            ChatMessage.objects.create(shipment=self.pn, author=self.agent, body=f"msg {i}")
+        ShipmentUpdate.objects.create(shipment=self.kin, status="IN_TRANSIT")
+        self.assertEqual(ActivityEvent.objects.count(), 18)
+
+        self.client.force_login(self.agent)
+        res = self.client.get("/dashboard/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.context["activities"]), 15)
+        self.assertEqual({a["container_code"] for a in res.context["activities"]}, {"C001"})
+
+        res = self.client.get("/dashboard/activity/", {"cursor": res.context["activity_cursor"]})
+        data = res.json()
+        self.assertEqual(len(data["items"]), 2)
+        self.assertIsNone(data["next_cursor"])
+
+    def test_shipment_changes_propagate_and_backfill(self):
+        ChatMessage.objects.create(shipment=self.kin, author=self.agent, body="hello")
+        self.kin.destination_site = "PN"
+        self.kin.save()
+        self.assertEqual(ActivityEvent.objects.get().destination_site, "PN")
+
+        ActivityEvent.objects.all().delete()
+        call_command("backfill_activity", stdout=StringIO())
+        self.assertEqual(ActivityEvent.objects.get().container_code, "C002")
+
+    def test_status_only_save_leaves_events_alone(self):
+        ChatMessage.objects.create(shipment=self.kin, author=self.agent, body="hello")
+        self.kin.status = "ARRIVED"
+        with CaptureQueriesContext(connection) as queries:
+            self.kin.save()
+        self.assertFalse([q for q in queries if "core_activityevent" in q["sql"]])
@@ -0,0 +1,77 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.alert_engine import evaluate_alerts
+from core.models import Alert
+from documents.models import Document
+from logistics.models import ContainerShipment
+from tests.factories import make_shipment
+
+
+@override_settings(ALERTS_TRANSIT_DAYS=7, ALERTS_REQUIRED_DOC_TYPES=["BL", "INVOICE"])
+class AlertEngineTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.agent = User.objects.create_user(
+            email="agent@example.com", password="pass1234", full_name="Agent", role="BRANCH_AGENT", site="PN"
+        )
+        self.pn = make_shipment("C001", "PN", "IN_TRANSIT")
+        self.kin = make_shipment("C002", "KIN", "IN_TRANSIT")
+
+    def _document(self, shipment, doc_type):
+        return Document.objects.create(linked_shipment=shipment, doc_type=doc_type, file=f"docs/{doc_type}.pdf")
+
+    def _rules(self, shipment):
+        return set(Alert.objects.filter(shipment=shipment).values_list("rule", flat=True))
+
+    def test_rules_are_evaluated_and_cleared(self):
+        ContainerShipment.objects.filter(pk=self.pn.pk).update(created_at=timezone.now() - timedelta(days=10))
+        evaluate_alerts()
+        self.assertEqual(self._rules(self.pn), {"LATE_TRANSIT", "MISSING_DOCS"})
+        self.assertEqual(Alert.objects.get(shipment=self.pn, rule="LATE_TRANSIT").priority, 0)
+        first_seen = Alert.objects.get(shipment=self.pn, rule="MISSING_DOCS").updated_at
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._document(self.pn, "BL")
+        missing = Alert.objects.get(shipment=self.pn, rule="MISSING_DOCS")
+        self.assertEqual(missing.message, "Manquants: INVOICE")
+        self.assertGreater(missing.updated_at, first_seen)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._document(self.pn, "INVOICE")
+            self.pn.status = "ARRIVED"
+            self.pn.save()
+        self.assertEqual(self._rules(self.pn), set())
+
+    def test_row_inserted_by_a_concurrent_evaluation_is_updated(self):
+        evaluate_alerts([self.pn.pk])
+        Alert.objects.filter(shipment=self.pn, rule="MISSING_DOCS").update(message="old")
+        # The select misses the row, as if another evaluation inserted it in between.
+        with mock.patch.object(QuerySet, "select_for_update", QuerySet.none):
+            evaluate_alerts([self.pn.pk])
+        alert = Alert.objects.get(shipment=self.pn, rule="MISSING_DOCS")
+        self.assertEqual(alert.message, "Manquants: BL, INVOICE")
+
+    def test_acknowledgement_survives_refresh(self):
+        call_command("refresh_alerts", stdout=StringIO())
+        alert = Alert.objects.get(shipment=self.pn)
+        self.client.force_login(self.agent)
+
+        res = self.client.get("/dashboard/")
+        self.assertEqual([a.container_code for a in res.context["alerts"]], ["C001"])
+
+        self.client.post(f"/alerts/{alert.pk}/ack/")
+        call_command("refresh_alerts", stdout=StringIO())
+        self.assertIsNotNone(Alert.objects.get(pk=alert.pk).acknowledged_at)
+        res = self.client.get("/dashboard/")
+        self.assertEqual(res.context["alerts"], [])
+
+        other = Alert.objects.get(shipment=self.kin)
+        self.assertEqual(self.client.post(f"/alerts/{other.pk}/ack/").status_code, 404)
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from chat.models import ChatMessage
+from logistics.models import ContainerShipment
+
+
+@override_settings(CHAT_PAGE_SIZE=3)
+class ChatPagesTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.agent = User.objects.create_user(
+            email="agent@example.com", password="pass1234", full_name="Agent", role="BRANCH_AGENT", site="PN"
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com", password="pass1234", full_name="Other", role="BRANCH_AGENT", site="PN"
+        )
+        self.shipment = ContainerShipment.objects.create(
+            container_no="C001",
+            bl_no="BL-1",
+            origin_country="FR",
+            destination_type="BRANCH_STOCK",
+            destination_site="PN",
+        )
+        start = datetime(2026, 1, 10, 9, 0, tzinfo=dt_timezone.utc)
+        # Day 1: agent, agent, other, other / day 2: other, agent
+        plan = [(self.agent, 0), (self.agent, 1), (self.other, 2), (self.other, 3), (self.other, 25), (self.agent, 26)]
+        for i, (author, hours) in enumerate(plan):
+            msg = ChatMessage.objects.create(shipment=self.shipment, author=author, body=f"m{i}")
+            ChatMessage.objects.filter(pk=msg.pk).update(created_at=start + timedelta(hours=hours))
+        self.client.force_login(self.agent)
+
+    def _flags(self, items):
+        return [(m["body"], m["show_date_separator"], m["show_avatar"]) for m in items]
+
+    def test_latest_page_and_scroll_back_keep_grouping(self):
+        res = self.client.get(f"/shipments/{self.shipment.pk}/")
+        page = res.context["chat_page"]
+        self.assertEqual(res.context["chat_count"], 6)
+        self.assertEqual(
+            self._flags(res.context["chat_messages"]),
+            [("m3", False, False), ("m4", True, False), ("m5", False, True)],
+        )
+
+        data = self.client.get(f"/shipments/{self.shipment.pk}/chat/messages/", {"before": page.first_cursor}).json()
+        self.assertEqual(self._flags(data["items"]), [("m0", True, True), ("m1", False, False), ("m2", False, True)])
+        self.assertIsNone(data["before_cursor"])
+
+    def test_after_cursor_returns_new_messages(self):
+        page = self.client.get(f"/shipments/{self.shipment.pk}/").context["chat_page"]
+        data = self.client.get(f"/shipments/{self.shipment.pk}/chat/messages/", {"after": page.last_cursor}).json()
+        self.assertEqual(data["items"], [])
+        self.assertEqual(data["after_cursor"], page.last_cursor)
+
+        ChatMessage.objects.create(shipment=self.shipment, author=self.agent, body="m6")
+        data = self.client.get(f"/shipments/{self.shipment.pk}/chat/messages/", {"after": page.last_cursor}).json()
+        self.assertEqual([(m["body"], m["show_avatar"], m["is_me"]) for m in data["items"]], [("m6", False, True)])
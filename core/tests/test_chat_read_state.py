@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from chat import read_state
+from chat.models import ChatMessage, ChatReadCursor, ChatReadWatermark
+from chat.read_state import unread_counts
+from logistics.models import ContainerShipment
+from tests.factories import make_shipment
+
+
+class ChatReadStateTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.agent = User.objects.create_user(
+            email="agent@example.com", password="pass1234", full_name="Agent", role="BRANCH_AGENT", site="PN"
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com", password="pass1234", full_name="Other", role="BRANCH_AGENT", site="PN"
+        )
+        self.first = make_shipment("C001")
+        self.second = make_shipment("C002")
+
+    def _say(self, shipment, author, body):
+        return ChatMessage.objects.create(shipment=shipment, author=author, body=body)
+
+    def test_counts_advance_when_chat_is_viewed(self):
+        self._say(self.first, self.other, "a")
+        self._say(self.first, self.other, "b")
+        self._say(self.first, self.agent, "mine")
+        self._say(self.second, self.other, "c")
+        shipments = ContainerShipment.objects.all()
+
+        with self.assertNumQueries(1):
+            counts = unread_counts(self.agent, shipments, ChatReadCursor.CHANNEL_TEAM)
+        self.assertEqual(counts, {self.first.pk: 2, self.second.pk: 1})
+
+        self.client.force_login(self.agent)
+        res = self.client.get("/dashboard/")
+        unread_alerts = [a for a in res.context["alerts"] if a.title == "Message non lu"]
+        self.assertEqual({a.container_code for a in unread_alerts}, {"C001", "C002"})
+        self.assertContains(res, 'title="Messages non lus">3</span>')
+
+        self.client.get(f"/shipments/{self.first.pk}/")
+        self.assertEqual(self.client.get("/chat/unread/").json(), {"total": 1, "shipments": {str(self.second.pk): 1}})
+
+        self._say(self.first, self.other, "d")
+        self.assertEqual(unread_counts(self.agent, shipments, ChatReadCursor.CHANNEL_TEAM)[self.first.pk], 1)
+
+    def test_messages_before_the_watermark_are_read(self):
+        old = self._say(self.first, self.other, "old")
+        ChatMessage.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=30))
+        self._say(self.second, self.other, "before watermark")
+        ChatReadWatermark.objects.create(user=self.agent, since=timezone.now())
+        self._say(self.second, self.other, "new")
+
+        counts = unread_counts(self.agent, ContainerShipment.objects.all(), ChatReadCursor.CHANNEL_TEAM)
+        self.assertEqual(counts, {self.second.pk: 1})
+
+    def test_dashboard_counts_once_and_unread_items_have_no_ack_form(self):
+        self._say(self.first, self.other, "a")
+        self.client.force_login(self.agent)
+        with mock.patch("core.views.unread_counts", wraps=read_state.unread_counts) as counted:
+            res = self.client.get("/dashboard/")
+        self.assertEqual(counted.call_count, 1)
+        self.assertContains(res, 'title="Messages non lus">1</span>')
+        self.assertNotContains(res, "/alerts/0/ack/")
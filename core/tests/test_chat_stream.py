@@ -0,0 +1,66 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from chat.models import ChatMessage
+from core.realtime import InProcessBroker, chat_channel, get_broker
+from logistics.models import ContainerShipment
+
+
+@override_settings(SSE_HEARTBEAT_SECONDS=0.05, SSE_MAX_SECONDS=0.2)
+class ChatStreamTests(TestCase):
+    def setUp(self):
+        self.agent = get_user_model().objects.create_user(
+            email="agent@example.com", password="pass1234", full_name="Agent", role="BRANCH_AGENT", site="PN"
+        )
+        self.shipment = ContainerShipment.objects.create(
+            container_no="C001",
+            bl_no="BL-1",
+            origin_country="FR",
+            destination_type="BRANCH_STOCK",
+            destination_site="PN",
+        )
+        ChatMessage.objects.create(shipment=self.shipment, author=self.agent, body="hello")
+
+    def test_in_process_broker_fans_out_per_channel(self):
+        broker = InProcessBroker()
+        first, second = broker.subscribe("a"), broker.subscribe("a")
+        other = broker.subscribe("b")
+        broker.publish("a", {"id": 1})
+        self.assertEqual((first.get(0.01), second.get(0.01), other.get(0.01)), ({"id": 1}, {"id": 1}, None))
+        first.close()
+        second.close()
+        other.close()
+        self.assertEqual(broker._subscribers, {})
+
+    def test_new_message_is_published_on_commit(self):
+        subscription = get_broker().subscribe(chat_channel("team", self.shipment.pk))
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                message = ChatMessage.objects.create(shipment=self.shipment, author=self.agent, body="again")
+            self.assertEqual(subscription.get(0.01)["id"], message.pk)
+        finally:
+            subscription.close()
+
+    def test_stream_pushes_only_new_messages(self):
+        self.client.force_login(self.agent)
+        res = self.client.get(f"/shipments/{self.shipment.pk}/chat/stream/")
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        chunks = iter(res.streaming_content)
+        self.assertEqual(next(chunks), b"retry: 3000\n\n")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ChatMessage.objects.create(shipment=self.shipment, author=self.agent, body="live")
+        events = [c.decode() for c in chunks]
+        messages = [e for e in events if e.startswith("id: ")]
+        self.assertEqual(len(messages), 1)
+        data = json.loads(messages[0].split("data: ", 1)[1])
+        self.assertEqual((data["body"], data["is_me"], data["show_avatar"]), ("live", True, False))
+        res.close()
+
+    @override_settings(SSE_MAX_STREAMS=0, SSE_BUSY_RETRY_MS=5000)
+    def test_stream_over_the_cap_asks_to_reconnect_later(self):
+        self.client.force_login(self.agent)
+        res = self.client.get(f"/shipments/{self.shipment.pk}/chat/stream/")
+        self.assertEqual(list(res.streaming_content), [b"retry: 5000\n\n"])
@@ -0,0 +1,41 @@
+import csv
+import io
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from logistics.models import ContainerItem
+from supply.models import Product
+from tests.factories import make_shipment
+
+
+class DashboardExportTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.boss = User.objects.create_user(
+            email="boss@example.com", password="pass1234", full_name="Boss", role="BOSS", site="BE"
+        )
+        product = Product.objects.create(sku="SKU-1", name="Widget")
+        shipment = make_shipment("C001", "PN", "IN_TRANSIT")
+        ContainerItem.objects.create(shipment=shipment, product=product, qty=2, unit_price=Decimal("10.00"))
+        ContainerItem.objects.create(shipment=shipment, product=product, qty=1, unit_price=Decimal("5.00"))
+        make_shipment("C002", "KIN", "DELIVERED")
+
+    def _rows(self, params):
+        self.client.force_login(self.boss)
+        res = self.client.get("/dashboard/export.csv", params)
+        self.assertTrue(res.streaming)
+        return list(csv.reader(io.StringIO(b"".join(res.streaming_content).decode())))
+
+    def test_export_applies_dashboard_filters(self):
+        rows = self._rows({"status": "IN_TRANSIT"})
+        self.assertEqual(rows[0], ["container_no", "bl_no", "status", "destination_site", "client_name", "created_at"])
+        self.assertEqual([r[0] for r in rows[1:]], ["C001"])
+        self.assertEqual([r[0] for r in self._rows({"q": "c00"})[1:]], ["C002", "C001"])
+
+    def test_export_totals_columns(self):
+        rows = self._rows({"totals": "1"})
+        self.assertEqual(rows[0][-2:], ["items_count", "total_value"])
+        totals = {r[0]: (r[-2], Decimal(r[-1])) for r in rows[1:]}
+        self.assertEqual(totals, {"C001": ("2", Decimal("25")), "C002": ("0", Decimal("0"))})
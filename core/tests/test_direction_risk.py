@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from documents.models import Document
+from tests.factories import make_shipment
+
+
+@override_settings(ALERTS_REQUIRED_DOC_TYPES=["BL", "INVOICE"], DIRECTION_RISK_TOP_N=2)
+class DirectionRiskTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.boss = User.objects.create_user(
+            email="boss@example.com", password="pass1234", full_name="Boss", role="BOSS", site="BE"
+        )
+        today = timezone.now().date()
+        self.documented = make_shipment("C001", "PN", "CREATED")
+        for doc_type in ("BL", "INVOICE"):
+            Document.objects.create(linked_shipment=self.documented, doc_type=doc_type, file=f"docs/{doc_type}.pdf")
+        self.half = make_shipment("C002", "PN", "IN_TRANSIT")
+        Document.objects.create(linked_shipment=self.half, doc_type="BL", file="docs/BL.pdf")
+        self.worst = make_shipment("C003", None, "IN_TRANSIT", eta=today - timedelta(days=1))
+        make_shipment("C004", "KIN", "DELIVERED")
+
+    def test_scores_rank_full_active_set(self):
+        self.client.force_login(self.boss)
+        res = self.client.get("/direction/")
+        self.assertEqual(res.status_code, 200)
+        ctx = res.context
+        self.assertEqual(ctx["missing_docs_count"], 2)
+        self.assertEqual(ctx["risks_count"], 2)
+        self.assertEqual([(i["shipment"].container_no, i["score"]) for i in ctx["risk_items"]], [("C003", 6), ("C002", 3)])
+        self.assertEqual(ctx["risk_items"][0]["reasons"], "Destination manquante, Docs manquants, En transit, ETA depassee")
+        self.assertEqual(ctx["docs_quality"], {"bl_pct": 66.7, "inv_pct": 33.3})
+
+    @override_settings(DIRECTION_RISK_WEIGHTS={"in_transit": 0, "missing_docs": 5})
+    def test_weights_come_from_settings(self):
+        self.client.force_login(self.boss)
+        items = self.client.get("/direction/").context["risk_items"]
+        self.assertEqual([(i["shipment"].container_no, i["score"]) for i in items], [("C003", 8), ("C002", 5)])
+        self.assertEqual(items[1]["reasons"], "Docs manquants")
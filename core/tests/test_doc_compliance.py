@@ -0,0 +1,44 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.compliance import DOC_TYPE_BITS
+from core.models import ShipmentDocCompliance
+from documents.models import Document
+from tests.factories import make_shipment
+
+
+@override_settings(ALERTS_REQUIRED_DOC_TYPES=["BL", "INVOICE"])
+class DocComplianceTests(TestCase):
+    def setUp(self):
+        self.first = make_shipment("C001")
+        self.second = make_shipment("C002")
+
+    def _compliance(self, shipment):
+        return ShipmentDocCompliance.objects.get(shipment=shipment)
+
+    def test_documents_update_mask(self):
+        self.assertEqual(self._compliance(self.first).doc_mask, 0)
+        Document.objects.create(linked_shipment=self.first, doc_type="BL", file="docs/bl.pdf")
+        invoice = Document.objects.create(linked_shipment=self.first, doc_type="INVOICE", file="docs/inv.pdf")
+        compliance = self._compliance(self.first)
+        self.assertEqual(compliance.doc_mask, DOC_TYPE_BITS["BL"] | DOC_TYPE_BITS["INVOICE"])
+        self.assertTrue(compliance.is_complete)
+
+        invoice = Document.objects.get(pk=invoice.pk)
+        invoice.linked_shipment = self.second
+        invoice.save()
+        self.assertFalse(self._compliance(self.first).is_complete)
+        self.assertEqual(self._compliance(self.second).doc_mask, DOC_TYPE_BITS["INVOICE"])
+
+        invoice.delete()
+        self.assertEqual(self._compliance(self.second).doc_mask, 0)
+
+    def test_rebuild_applies_new_required_types(self):
+        Document.objects.create(linked_shipment=self.first, doc_type="BL", file="docs/bl.pdf")
+        ShipmentDocCompliance.objects.filter(shipment=self.second).delete()
+        with override_settings(ALERTS_REQUIRED_DOC_TYPES=["BL"]):
+            call_command("rebuild_doc_compliance", stdout=StringIO())
+        self.assertTrue(self._compliance(self.first).is_complete)
+        self.assertFalse(self._compliance(self.second).is_complete)
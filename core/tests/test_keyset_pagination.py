@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+
+from core.pagination import keyset_page
+from logistics.models import ContainerShipment
+from tests.factories import make_shipment
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        for i in range(7):
+            make_shipment(f"C{i:03d}")
+
+    def _codes(self, page):
+        return [s.container_no for s in page]
+
+    def test_forward_and_backward(self):
+        qs = ContainerShipment.objects.all()
+        first = keyset_page(qs, QueryDict("status=X"), per_page=3)
+        self.assertEqual(self._codes(first), ["C006", "C005", "C004"])
+        self.assertFalse(first.has_previous)
+        self.assertEqual((first.count, first.count_is_approximate), (7, False))
+        self.assertIn("status=X", first.next_query)
+
+        second = keyset_page(qs, QueryDict(first.next_query), per_page=3)
+        third = keyset_page(qs, QueryDict(second.next_query), per_page=3)
+        self.assertEqual(self._codes(second), ["C003", "C002", "C001"])
+        self.assertEqual(self._codes(third), ["C000"])
+        self.assertFalse(third.has_next)
+
+        back = keyset_page(qs, QueryDict(third.previous_query), per_page=3)
+        self.assertEqual(self._codes(back), ["C003", "C002", "C001"])
+        back = keyset_page(qs, QueryDict(back.previous_query), per_page=3)
+        self.assertEqual(self._codes(back), ["C006", "C005", "C004"])
+        self.assertFalse(back.has_previous)
+
+    @override_settings(LIST_COUNT_THRESHOLD=5)
+    def test_count_is_bounded_and_list_view_renders(self):
+        page = keyset_page(ContainerShipment.objects.all(), QueryDict(), per_page=3)
+        self.assertEqual((page.count, page.count_is_approximate, page.count_is_lower_bound), (5, False, True))
+
+        boss = get_user_model().objects.create_user(
+            email="boss@example.com", password="pass1234", full_name="Boss", role="BOSS", site="BE"
+        )
+        self.client.force_login(boss)
+        res = self.client.get("/shipments/")
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "(5+)")
@@ -0,0 +1,39 @@
+from unittest import skipUnless
+
+from django.test import RequestFactory, TestCase, override_settings
+
+from core import metrics
+from core.views import _metrics_allowed
+
+
+class MetricsAccessTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_private_network_only_without_token(self):
+        self.assertTrue(_metrics_allowed(self.factory.get("/metrics", REMOTE_ADDR="fdaa:0:1::3")))
+        self.assertTrue(_metrics_allowed(self.factory.get("/metrics", REMOTE_ADDR="127.0.0.1")))
+        self.assertFalse(_metrics_allowed(self.factory.get("/metrics", REMOTE_ADDR="8.8.8.8")))
+        # Public traffic reaches the app through the proxy, from a private address.
+        proxied = self.factory.get("/metrics", REMOTE_ADDR="172.16.0.2", HTTP_FLY_CLIENT_IP="8.8.8.8")
+        self.assertFalse(_metrics_allowed(proxied))
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token_required_when_configured(self):
+        self.assertFalse(_metrics_allowed(self.factory.get("/metrics", REMOTE_ADDR="127.0.0.1")))
+        authorized = self.factory.get("/metrics", REMOTE_ADDR="8.8.8.8", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertTrue(_metrics_allowed(authorized))
+
+
+@skipUnless(metrics.ENABLED, "prometheus_client is not installed")
+class MetricsEndpointTests(TestCase):
+    def test_exposes_request_metrics(self):
+        self.client.get("/healthz")
+        response = self.client.get("/metrics", REMOTE_ADDR="127.0.0.1")
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('fagouflow_request_duration_seconds_count{method="GET",view="healthz"}', body)
+        self.assertIn('fagouflow_responses_total{method="GET",status="200",view="healthz"}', body)
+
+    def test_forbidden_from_public_address(self):
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="8.8.8.8").status_code, 403)
@@ -0,0 +1,49 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import TestCase, override_settings
+
+from core.middleware import RequestTimingMiddleware
+from logistics.models import ContainerShipment
+
+
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            email="staff@example.com", password="pass1234", full_name="Staff", role="BOSS", site="BE", is_staff=True
+        )
+        self.agent = User.objects.create_user(
+            email="agent@example.com", password="pass1234", full_name="Agent", role="BRANCH_AGENT", site="PN"
+        )
+        ContainerShipment.objects.create(
+            container_no="C001", bl_no="BL-C001", origin_country="FR", destination_type="BRANCH_STOCK", destination_site="PN"
+        )
+
+    def test_server_timing_only_for_staff(self):
+        self.client.force_login(self.staff)
+        header = self.client.get("/shipments/")["Server-Timing"]
+        self.assertIn("total;dur=", header)
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertRegex(header, r"tpl;dur=[\d.]+")
+
+        self.client.force_login(self.agent)
+        self.assertNotIn("Server-Timing", self.client.get("/shipments/"))
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_TOP_SQL=2)
+    def test_slow_request_logs_slowest_queries(self):
+        self.client.force_login(self.agent)
+        with self.assertLogs("core.slow_requests", level="WARNING") as logs:
+            self.client.get("/shipments/")
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["path"], "/shipments/")
+        self.assertEqual(entry["status"], 200)
+        self.assertGreater(entry["sql_count"], 2)
+        self.assertEqual(len(entry["slowest_sql"]), 2)
+        self.assertTrue(all(q["call_site"] for q in entry["slowest_sql"]))
+
+    @override_settings(REQUEST_TIMING_ENABLED=False)
+    def test_disabled_middleware_is_dropped(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestTimingMiddleware(lambda request: None)
@@ -0,0 +1,54 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from core.stats import compute_shipment_stats, get_shipment_stats
+from logistics.models import ContainerItem, ContainerShipment
+from supply.models import Product
+from tests.factories import make_shipment
+
+
+class ShipmentStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = Product.objects.create(sku="SKU-1", name="Widget")
+        yesterday = timezone.now().date() - timedelta(days=1)
+        self.late = make_shipment("C001", "PN", "IN_TRANSIT", eta=yesterday)
+        make_shipment("C002", "PN", "IN_TRANSIT")
+        make_shipment("C003", "PN", "DELIVERED")
+        ContainerItem.objects.create(shipment=self.late, product=self.product, qty=2, unit_price=Decimal("10.00"))
+        ContainerItem.objects.create(shipment=self.late, product=self.product, qty=1, unit_price=Decimal("5.00"))
+
+    def test_counters_and_value_in_one_query(self):
+        with self.assertNumQueries(1):
+            stats = compute_shipment_stats(ContainerShipment.objects.all())
+        self.assertEqual((stats.total, stats.in_transit, stats.delivered, stats.late), (3, 2, 1, 1))
+        self.assertEqual(stats.total_value, Decimal("25.00"))
+
+    def test_cached_until_shipment_or_item_changes(self):
+        qs = ContainerShipment.objects.all()
+        self.assertEqual(get_shipment_stats("global", qs).total, 3)
+        with self.assertNumQueries(0):
+            get_shipment_stats("global", qs)
+
+        make_shipment("C004", "PN", "CREATED")
+        self.assertEqual(get_shipment_stats("global", qs).total, 4)
+        ContainerItem.objects.create(shipment=self.late, product=self.product, qty=1, unit_price=Decimal("1.00"))
+        self.assertEqual(get_shipment_stats("global", qs).total_value, Decimal("26.00"))
+
+    def test_dashboard_uses_stats(self):
+        user = get_user_model().objects.create_user(
+            email="boss@example.com", password="pass1234", full_name="Boss", role="BOSS", site="BE", is_staff=True
+        )
+        self.client.force_login(user)
+        res = self.client.get("/dashboard/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.context["total_shipments"], 3)
+        self.assertEqual(res.context["in_transit"], 2)
+        res = self.client.get("/direction/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.context["delivered_count"], 1)
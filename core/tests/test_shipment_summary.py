@@ -0,0 +1,89 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from chat.models import ChatMessage
+from core.models import ShipmentUpdate
+from documents.models import Document
+from logistics.models import ContainerItem, ContainerShipment
+from supply.models import Product
+from tests.factories import make_shipment
+
+
+class ShipmentSummaryTests(TestCase):
+    def setUp(self):
+        self.shipment = make_shipment("C001")
+        self.product = Product.objects.create(sku="SKU-1", name="Widget")
+
+    def _reload(self, shipment=None):
+        return ContainerShipment.objects.get(pk=(shipment or self.shipment).pk)
+
+    def test_writes_keep_summary_current(self):
+        other = make_shipment("C002")
+        doc = Document.objects.create(linked_shipment=self.shipment, doc_type="BL", file="docs/bl.pdf")
+        message = ChatMessage.objects.create(shipment=self.shipment, body="hello")
+        ChatMessage.objects.create(shipment=self.shipment, body="again")
+        update = ShipmentUpdate.objects.create(shipment=self.shipment, status="IN_TRANSIT")
+        item = ContainerItem.objects.create(shipment=self.shipment, product=self.product, qty=3, unit_price=Decimal("2.50"))
+
+        shipment = self._reload()
+        self.assertEqual(shipment.docs_count, 1)
+        self.assertEqual(shipment.chat_count, 2)
+        self.assertEqual(shipment.last_update_at, update.created_at)
+        self.assertEqual(shipment.total_value, Decimal("7.50"))
+
+        doc = Document.objects.get(pk=doc.pk)
+        doc.linked_shipment = other
+        doc.save()
+        message.delete()
+        update.delete()
+        item.qty = 4
+        item.save()
+
+        shipment = self._reload()
+        self.assertEqual(shipment.docs_count, 0)
+        self.assertEqual(self._reload(other).docs_count, 1)
+        self.assertEqual(shipment.chat_count, 1)
+        self.assertIsNone(shipment.last_update_at)
+        self.assertEqual(shipment.total_value, Decimal("10.00"))
+
+    def test_stale_instance_save_keeps_counters(self):
+        stale = self._reload()
+        ChatMessage.objects.create(shipment=self.shipment, body="hello")
+        stale.status = "DELIVERED"
+        stale.save()
+        shipment = self._reload()
+        self.assertEqual(shipment.status, "DELIVERED")
+        self.assertEqual(shipment.chat_count, 1)
+
+    def test_save_of_a_deleted_row_inserts_it(self):
+        shipment = self._reload()
+        ContainerShipment.objects.filter(pk=shipment.pk).delete()
+        shipment.save()
+        self.assertTrue(ContainerShipment.objects.filter(pk=shipment.pk).exists())
+
+    def test_stats_invalidated_after_item_value_refresh(self):
+        seen = []
+        with mock.patch("core.signals.invalidate_shipment_stats", lambda: seen.append(self._reload().total_value)):
+            ContainerItem.objects.create(shipment=self.shipment, product=self.product, qty=2, unit_price=Decimal("5"))
+        self.assertEqual(seen, [Decimal("10")])
+
+    def test_reconcile_fixes_drift(self):
+        ChatMessage.objects.create(shipment=self.shipment, body="hello")
+        update = ShipmentUpdate.objects.create(shipment=self.shipment, status="IN_TRANSIT")
+        ShipmentUpdate.objects.filter(pk=update.pk).update(created_at=update.created_at + timedelta(days=1))
+        ContainerShipment.objects.filter(pk=self.shipment.pk).update(chat_count=9, docs_count=4, total_value=1)
+
+        out = StringIO()
+        call_command("reconcile_shipment_summaries", stdout=out)
+
+        shipment = self._reload()
+        self.assertEqual(shipment.chat_count, 1)
+        self.assertEqual(shipment.docs_count, 0)
+        self.assertEqual(shipment.total_value, Decimal("0"))
+        self.assertEqual(shipment.last_update_at, update.created_at + timedelta(days=1))
+        self.assertIn("reconciled", out.getvalue())
@@ -0,0 +1,109 @@
+"""Per-request timings collected by RequestTimingMiddleware."""
+from __future__ import annotations
+
+import heapq
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+_thread_locals = threading.local()
+
+
+@dataclass
+class RequestTimings:
+    started: float = field(default_factory=time.perf_counter)
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+    template_seconds: float = 0.0
+    top_n: int = 5
+    # Min-heap of (duration, order, sql, call site) for the slowest statements.
+    slowest: List[Tuple[float, int, str, str]] = field(default_factory=list)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add_query(self, sql: str, duration: float) -> None:
+        self.sql_count += 1
+        self.sql_seconds += duration
+        if self.top_n <= 0:
+            return
+        if len(self.slowest) < self.top_n:
+            heapq.heappush(self.slowest, (duration, self.sql_count, sql, call_site()))
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, self.sql_count, sql, call_site()))
+
+    def slowest_queries(self) -> List[dict]:
+        return [
+            {"ms": round(duration * 1000, 1), "sql": sql, "call_site": site}
+            for duration, _order, sql, site in sorted(self.slowest, reverse=True)
+        ]
+
+    def server_timing(self) -> str:
+        return ", ".join([
+            f"total;dur={self.elapsed() * 1000:.1f}",
+            f'db;dur={self.sql_seconds * 1000:.1f};desc="{self.sql_count} queries"',
+            f"tpl;dur={self.template_seconds * 1000:.1f}",
+        ])
+
+
+def get_current_timings() -> Optional[RequestTimings]:
+    return getattr(_thread_locals, "timings", None)
+
+
+def set_current_timings(timings: Optional[RequestTimings]) -> None:
+    _thread_locals.timings = timings
+
+
+def call_site() -> str:
+    """Innermost project frame (outside installed packages), as "path:line in function"."""
+    frame = sys._getframe(1)
+    base_dir = str(settings.BASE_DIR) + os.sep
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__ and filename.startswith(base_dir) and "-packages" + os.sep not in filename:
+            return f"{filename.removeprefix(base_dir)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return ""
+
+
+def record_sql(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook adding each statement to the current timings."""
+    timings = get_current_timings()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(sql, time.perf_counter() - start)
+
+
+_template_hook_installed = False
+
+
+def install_template_timing() -> None:
+    """Time top-level template renders (includes are counted in their parent)."""
+    global _template_hook_installed
+    if _template_hook_installed:
+        return
+    from django.template.backends.django import Template
+
+    original_render = Template.render
+
+    def render(self, context=None, request=None):
+        timings = get_current_timings()
+        if timings is None:
+            return original_render(self, context, request)
+        start = time.perf_counter()
+        try:
+            return original_render(self, context, request)
+        finally:
+            timings.template_seconds += time.perf_counter() - start
+
+    Template.render = render
+    _template_hook_installed = True
@@ -1,5 +1,8 @@
-import csv
+import hmac
+import ipaddress
+import json
 import os
+import time
 from functools import wraps
 from datetime import timedelta
 from django.conf import settings
@@ -7,21 +10,33 @@ from django.contrib import messages
 from django.contrib.auth import logout as auth_logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView
-from django.core.paginator import Paginator
-from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
-from django.http import FileResponse, HttpResponse, Http404, HttpResponseForbidden
+from django.db.models import Count, Q
+from django.http import FileResponse, HttpResponse, Http404, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 
 # Import de tes modèles
-from chat.models import ChatMessage, ClientChatMessage
+from chat.models import ChatMessage, ChatReadCursor, ClientChatMessage
+from chat.read_state import mark_read, unread_counts
+from core.activity import activity_page
 from core.alerts import build_alerts
-from core.models import ShipmentUpdate
+from core.chat_pages import latest_messages, messages_after, messages_before
+from core import metrics as app_metrics
+from core.export import iter_shipments_csv
+from core.models import ActivityEvent, Alert, ShipmentUpdate
+from core.pagination import encode_cursor, keyset_page
+from core.realtime import acquire_stream_slot, chat_channel, get_broker, release_stream_slot
+from core.risk import annotate_risk, doc_flag, risk_summary, top_risks
+from core.stats import get_shipment_stats
+from core.templatetags.user_display import display_name
 from documents.models import Document, DocumentShare
-from logistics.models import ContainerShipment, ContainerItem, StatusHistory
+from logistics.models import ContainerShipment, StatusHistory
+from logistics.search import search_shipments
+from reports.facts import site_trends, sum_facts
 
 # Fly.io health check (lightweight, no auth, no DB)
 def healthz(request):
@@ -29,6 +44,30 @@ def healthz(request):
         return HttpResponse("method not allowed", content_type="text/plain", status=405)
     return HttpResponse("ok", content_type="text/plain", status=200)
 
+
+def _metrics_allowed(request):
+    """Jeton Bearer si METRICS_TOKEN est défini, sinon accès direct depuis le réseau privé uniquement."""
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+    # Les requêtes publiques passent par le proxy Fly, qui ajoute ces en-têtes.
+    if request.headers.get("Fly-Client-IP") or request.headers.get("X-Forwarded-For"):
+        return False
+    try:
+        return ipaddress.ip_address(request.META.get("REMOTE_ADDR", "")).is_private
+    except ValueError:
+        return False
+
+
+# Exposition Prometheus (agrégée sur tous les workers gunicorn)
+def metrics(request):
+    if not app_metrics.ENABLED:
+        raise Http404
+    if not _metrics_allowed(request):
+        return HttpResponseForbidden("forbidden", content_type="text/plain")
+    body, content_type = app_metrics.render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
  # PREVIEW ONLY – TO DELETE: mock data for client portal UI
 def preview_client_dashboard(request):
     today = timezone.now().date()
@@ -142,18 +181,84 @@ def get_user_site(user):
     """Utilitaire pour éviter les erreurs si l'user n'a pas de site"""
     return getattr(user, 'site', None)
 
+def _is_privileged(user):
+    role = getattr(user, 'role', 'USER')
+    return role in ("BOSS", "HQ_ADMIN") or get_user_site(user) == "BE"
+
+
 def get_visible_shipments(user):
     """Filtre les expéditions selon le rôle et le site"""
-    role = getattr(user, 'role', 'USER')
-    site = get_user_site(user)
-    
-    is_privileged = role in ("BOSS", "HQ_ADMIN") or site == "BE"
-    
-    if is_privileged:
+    if _is_privileged(user):
         return ContainerShipment.objects.all()
+    site = get_user_site(user)
     return ContainerShipment.objects.filter(Q(destination_site=site) | Q(destination_site__isnull=True))
 
 
+def get_visible_scope(user):
+    """Clé du périmètre visible, utilisée pour le cache des statistiques"""
+    if _is_privileged(user):
+        return "global"
+    return f"site:{get_user_site(user)}"
+
+
+def get_visible_activity(user):
+    """Fil d'activité limité au même périmètre que get_visible_shipments"""
+    if _is_privileged(user):
+        return ActivityEvent.objects.all()
+    site = get_user_site(user)
+    return ActivityEvent.objects.filter(Q(destination_site=site) | Q(destination_site__isnull=True))
+
+
+def get_visible_alerts(user):
+    """Alertes précalculées, limitées au même périmètre que get_visible_shipments"""
+    if _is_privileged(user):
+        return Alert.objects.all()
+    site = get_user_site(user)
+    return Alert.objects.filter(Q(destination_site=site) | Q(destination_site__isnull=True))
+
+
+def get_unread_counts(request):
+    """Messages non lus par expédition : chat client pour les clients, chat d'équipe sinon.
+
+    Calculés une seule fois par requête (vue et badge de navigation partagent le résultat).
+    """
+    if not hasattr(request, "_chat_unread_counts"):
+        user = request.user
+        if _is_linked_client(user):
+            counts = unread_counts(user, get_client_shipments(user), ChatReadCursor.CHANNEL_CLIENT)
+        else:
+            counts = unread_counts(user, get_visible_shipments(user), ChatReadCursor.CHANNEL_TEAM)
+        request._chat_unread_counts = counts
+    return request._chat_unread_counts
+
+
+def _activity_item(event):
+    return {
+        "timestamp": event.created_at,
+        "user": event.actor,
+        "action": event.action,
+        "shipment_id": event.shipment_id,
+        "container_code": event.container_code,
+    }
+
+
+def get_shipment_filters(request):
+    """Filtres q / status / destination partagés par le tableau de bord et l'export"""
+    return (
+        (request.GET.get("q") or "").strip(),
+        (request.GET.get("status") or "").strip(),
+        (request.GET.get("destination") or "").strip(),
+    )
+
+
+def filter_shipments(qs, q="", status_filter="", dest_filter=""):
+    if status_filter and status_filter != "ALL":
+        qs = qs.filter(status=status_filter)
+    if dest_filter and dest_filter != "ALL":
+        qs = qs.filter(destination_site=dest_filter)
+    return search_shipments(qs, q)
+
+
 def get_client_key(user):
     full_name = (getattr(user, "full_name", "") or "").strip()
     if full_name:
@@ -171,6 +276,10 @@ def get_client_shipments(user):
     return ContainerShipment.objects.filter(client=client)
 
 
+def get_client_stats(user):
+    return get_shipment_stats(f"client:{getattr(user, 'client_id', None)}", get_client_shipments(user))
+
+
 def get_avatar_url(author):
     if not author:
         return None
@@ -196,10 +305,12 @@ def get_avatar_url(author):
     return None
 
 
-def build_chat_messages_ui(messages, current_user):
+def build_chat_messages_ui(messages, current_user, previous=None):
+    """Prépare les messages pour l'affichage ; ``previous`` est le message qui précède la page"""
     chat_messages_ui = []
-    prev_author_id = None
-    prev_date = None
+    prev_author = getattr(previous, "author", None) if previous else None
+    prev_author_id = prev_author.pk if prev_author else None
+    prev_date = previous.created_at.date() if previous and previous.created_at else None
     for m in messages:
         author = getattr(m, "author", None)
         full = ""
@@ -229,6 +340,7 @@ def build_chat_messages_ui(messages, current_user):
         is_client = getattr(author, "role", "") == "CLIENT"
 
         chat_messages_ui.append({
+            "id": m.pk,
             "author_name": author_name,
             "initials": initials,
             "avatar_url": avatar_url,
@@ -246,6 +358,86 @@ def build_chat_messages_ui(messages, current_user):
     return chat_messages_ui
 
 
+def _chat_item_json(item):
+    item["time_label"] = timezone.localtime(item["created_at"]).strftime("%H:%M")
+    item["created_at"] = item["created_at"].isoformat()
+    return item
+
+
+def _chat_events(user, queryset, channel, shipment_id, cursor):
+    """Événements SSE pour les messages postérieurs au curseur ; renvoie le nouveau curseur"""
+    while True:
+        page = messages_after(queryset, cursor)
+        items = build_chat_messages_ui(page.messages, user, previous=page.previous)
+        for message, item in zip(page.messages, items):
+            cursor = encode_cursor(message)
+            payload = json.dumps(_chat_item_json(item), cls=DjangoJSONEncoder)
+            yield f"id: {cursor}\nevent: message\ndata: {payload}\n\n"
+        if page.messages:
+            mark_read(user, shipment_id, channel, page.messages[-1])
+        if not page.has_more:
+            return cursor
+
+
+def _chat_stream(user, queryset, channel, shipment_id, cursor):
+    if not acquire_stream_slot():
+        # Trop de flux ouverts dans ce processus : le navigateur se reconnectera plus tard
+        yield f"retry: {getattr(settings, 'SSE_BUSY_RETRY_MS', 30000)}\n\n"
+        return
+    heartbeat = float(getattr(settings, "SSE_HEARTBEAT_SECONDS", 15))
+    deadline = time.monotonic() + float(getattr(settings, "SSE_MAX_SECONDS", 300))
+    subscription = get_broker().subscribe(chat_channel(channel, shipment_id))
+    try:
+        yield "retry: 3000\n\n"
+        cursor = yield from _chat_events(user, queryset, channel, shipment_id, cursor)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if subscription.get(timeout=min(heartbeat, remaining)) is None:
+                yield ": keepalive\n\n"
+                continue
+            cursor = yield from _chat_events(user, queryset, channel, shipment_id, cursor)
+    finally:
+        subscription.close()
+        release_stream_slot()
+
+
+def chat_stream_response(request, queryset, channel, shipment_id):
+    """Flux SSE des nouveaux messages ; reprend après Last-Event-ID ou ?after=, sinon après le dernier message"""
+    cursor = request.headers.get("Last-Event-ID") or request.GET.get("after")
+    if not cursor:
+        latest = queryset.order_by("-created_at", "-id").first()
+        cursor = encode_cursor(latest) if latest else None
+    response = StreamingHttpResponse(
+        _chat_stream(request.user, queryset, channel, shipment_id, cursor), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def chat_messages_response(request, queryset, channel, shipment_id):
+    """Page JSON du chat : ?before=<curseur> (historique) ou ?after=<curseur> (nouveaux messages)"""
+    before = request.GET.get("before")
+    after = request.GET.get("after")
+    if before:
+        page = messages_before(queryset, before)
+    elif after:
+        page = messages_after(queryset, after)
+        if page.messages:
+            mark_read(request.user, shipment_id, channel, page.messages[-1])
+    else:
+        page = latest_messages(queryset)
+    items = [_chat_item_json(item) for item in build_chat_messages_ui(page.messages, request.user, previous=page.previous)]
+    return JsonResponse({
+        "items": items,
+        "has_more": page.has_more,
+        "before_cursor": page.first_cursor if page.has_more and not after else None,
+        "after_cursor": page.last_cursor or after,
+    })
+
+
 def _is_client(user):
     return getattr(user, "role", "") == "CLIENT"
 
@@ -288,30 +480,14 @@ def dashboard(request):
         return redirect_response
     visible = get_visible_shipments(user)
     
+    stats = get_shipment_stats(get_visible_scope(user), visible)
+
     shipments = list(visible.order_by("-created_at")[:5])
     for s in shipments: 
         s.status_label = STATUS_LABELS.get(s.status, s.status)
-    
-    # Calcul de la valeur totale avec gestion des cas vides
-    total_val = ContainerItem.objects.filter(shipment__in=visible).aggregate(
-        total=Sum(ExpressionWrapper(F("qty") * F("unit_price"), output_field=DecimalField(max_digits=20, decimal_places=2)))
-    )["total"] or 0
-
-    q = (request.GET.get("q") or "").strip()
-    status_filter = (request.GET.get("status") or "").strip()
-    dest_filter = (request.GET.get("destination") or "").strip()
-
-    track_qs = visible.order_by("-created_at")
-    if q:
-        track_qs = track_qs.filter(
-            Q(container_no__icontains=q) |
-            Q(bl_no__icontains=q) |
-            Q(client_name__icontains=q)
-        )
-    if status_filter and status_filter != "ALL":
-        track_qs = track_qs.filter(status=status_filter)
-    if dest_filter and dest_filter != "ALL":
-        track_qs = track_qs.filter(destination_site=dest_filter)
+
+    q, status_filter, dest_filter = get_shipment_filters(request)
+    track_qs = filter_shipments(visible.order_by("-created_at"), q, status_filter, dest_filter)
 
     track_shipments = list(track_qs[:20])
     for s in track_shipments:
@@ -325,60 +501,27 @@ def dashboard(request):
         .distinct()
     )
     
-    alerts = build_alerts(visible)
-
-    activities = []
-    try:
-        doc_qs = Document.objects.filter(linked_shipment__in=visible).select_related("uploaded_by", "linked_shipment").order_by("-uploaded_at")[:15]
-        for d in doc_qs:
-            activities.append({
-                "timestamp": d.uploaded_at,
-                "user": d.uploaded_by,
-                "action": f"a ajouté un document {d.doc_type} (v{d.version})",
-                "shipment_id": d.linked_shipment_id,
-                "container_code": getattr(d.linked_shipment, "container_no", ""),
-            })
-    except Exception:
-        pass
-
-    try:
-        chat_qs = ChatMessage.objects.filter(shipment__in=visible).select_related("author", "shipment").order_by("-created_at")[:15]
-        for m in chat_qs:
-            activities.append({
-                "timestamp": m.created_at,
-                "user": m.author,
-                "action": "a envoyé un message",
-                "shipment_id": m.shipment_id,
-                "container_code": getattr(m.shipment, "container_no", ""),
-            })
-    except Exception:
-        pass
-
-    try:
-        upd_qs = ShipmentUpdate.objects.filter(shipment__in=visible).select_related("created_by", "shipment").order_by("-created_at")[:15]
-        for u in upd_qs:
-            activities.append({
-                "timestamp": u.created_at,
-                "user": u.created_by,
-                "action": f"statut mis à jour: {u.status}",
-                "shipment_id": u.shipment_id,
-                "container_code": getattr(u.shipment, "container_no", ""),
-            })
-    except Exception:
-        pass
+    unread = get_unread_counts(request)
+    unread_shipments = visible.filter(pk__in=list(unread)).values_list("id", "container_no")
+    alerts = build_alerts(
+        get_visible_alerts(user),
+        unread=[(sid, container_no, unread[sid]) for sid, container_no in unread_shipments],
+    )
 
-    activities = sorted([a for a in activities if a.get("timestamp")], key=lambda a: a["timestamp"], reverse=True)[:15]
+    activity_events, activity_cursor = activity_page(get_visible_activity(user))
+    activities = [_activity_item(e) for e in activity_events]
 
     return render(request, "ui/dashboard.html", {
         "user": user, 
         "shipments": shipments, 
-        "total_shipments": visible.count(), 
-        "in_transit": visible.filter(status="IN_TRANSIT").count(), 
-        "delivered": visible.filter(status="DELIVERED").count(), 
-        "total_value": total_val,
+        "total_shipments": stats.total,
+        "in_transit": stats.in_transit,
+        "delivered": stats.delivered,
+        "total_value": stats.total_value or 0,
         "alerts": alerts,
         "alerts_count": len(alerts),
         "activities": activities,
+        "activity_cursor": activity_cursor,
         "track_shipments": track_shipments,
         "q": q,
         "status_filter": status_filter or "ALL",
@@ -388,22 +531,57 @@ def dashboard(request):
     })
 
 
+@login_required
+def dashboard_activity(request):
+    """Page suivante du fil d'activité (bouton « Voir plus »)"""
+    redirect_response = _redirect_client_if_needed(request.user)
+    if redirect_response:
+        return redirect_response
+    events, next_cursor = activity_page(get_visible_activity(request.user), cursor=request.GET.get("cursor"))
+    items = []
+    for e in events:
+        items.append({
+            "timestamp": e.created_at.isoformat(),
+            "time_label": timezone.localtime(e.created_at).strftime("%d/%m %H:%M"),
+            "user": display_name(e.actor),
+            "action": e.action,
+            "shipment_id": e.shipment_id,
+            "container_code": e.container_code,
+        })
+    return JsonResponse({"items": items, "next_cursor": next_cursor})
+
+
+@login_required
+def chat_unread(request):
+    """Compteurs de messages non lus (badges de navigation)"""
+    counts = get_unread_counts(request)
+    return JsonResponse({"total": sum(counts.values()), "shipments": {str(k): v for k, v in counts.items()}})
+
+
+@login_required
+def alert_acknowledge(request, alert_id):
+    """Acquitte une alerte : elle disparaît du tableau de bord tant que la condition persiste"""
+    if request.method != "POST":
+        return HttpResponse(status=405)
+    redirect_response = _redirect_client_if_needed(request.user)
+    if redirect_response:
+        return redirect_response
+    alert = get_object_or_404(get_visible_alerts(request.user), pk=alert_id)
+    if alert.acknowledged_at is None:
+        alert.acknowledged_at = timezone.now()
+        alert.acknowledged_by = request.user
+        alert.save(update_fields=["acknowledged_at", "acknowledged_by", "updated_at"])
+    return redirect("dashboard")
+
+
 @login_required
 def dashboard_export(request):
-    visible = get_visible_shipments(request.user).order_by("-created_at")
-    response = HttpResponse(content_type="text/csv")
+    """Export CSV en streaming, avec les mêmes filtres que le tableau de bord (?totals=1 ajoute articles et valeur)"""
+    q, status_filter, dest_filter = get_shipment_filters(request)
+    visible = filter_shipments(get_visible_shipments(request.user), q, status_filter, dest_filter)
+    with_totals = request.GET.get("totals") in ("1", "true", "yes")
+    response = StreamingHttpResponse(iter_shipments_csv(visible, with_totals=with_totals), content_type="text/csv")
     response["Content-Disposition"] = 'attachment; filename="shipments.csv"'
-    writer = csv.writer(response)
-    writer.writerow(["container_no", "bl_no", "status", "destination_site", "client_name", "created_at"])
-    for s in visible:
-        writer.writerow([
-            s.container_no,
-            s.bl_no,
-            s.status,
-            s.destination_site or "",
-            s.client_name or "",
-            s.created_at.strftime("%Y-%m-%d %H:%M"),
-        ])
     return response
 
 
@@ -422,87 +600,27 @@ def direction_view(request):
 
     visible = get_visible_shipments(user)
     now = timezone.now()
-    transit_days = int(getattr(settings, "ALERTS_TRANSIT_DAYS", 7))
     required_docs = list(getattr(settings, "ALERTS_REQUIRED_DOC_TYPES", ["BL", "INVOICE"]))
 
-    total_count = visible.count()
-    in_transit_qs = visible.filter(status="IN_TRANSIT")
-    delivered_qs = visible.filter(status="DELIVERED")
+    stats = get_shipment_stats(get_visible_scope(user), visible)
     active_qs = visible.exclude(status="DELIVERED")
 
-    total_value = None
-    try:
-        total_value = ContainerItem.objects.filter(shipment__in=visible).aggregate(
-            total=Sum(ExpressionWrapper(F("qty") * F("unit_price"), output_field=DecimalField(max_digits=20, decimal_places=2)))
-        )["total"]
-    except Exception:
-        total_value = None
-
-    blocked_count = 0
-    try:
-        blocked_count = visible.filter(status__in=["EN_DOUANE", "BLOCKED"]).count()
-    except Exception:
-        blocked_count = 0
-
-    # Docs missing on active shipments
-    missing_docs_count = 0
-    doc_ids = set()
-    if required_docs:
-        try:
-            doc_ids = set(Document.objects.filter(linked_shipment__in=active_qs, doc_type__in=required_docs).values_list("linked_shipment_id", "doc_type"))
-            for s in active_qs:
-                if any((s.id, d) not in doc_ids for d in required_docs):
-                    missing_docs_count += 1
-        except Exception:
-            missing_docs_count = 0
-
-    # Risk scoring
-    risk_items = []
-    field_names = {f.name for f in ContainerShipment._meta.get_fields()}
-    for s in active_qs.order_by("-created_at")[:200]:
-        score = 0
-        reasons = []
-        if not getattr(s, "destination_site", None):
-            score += 2
-            reasons.append("Destination manquante")
-        if required_docs and doc_ids and any((s.id, d) not in doc_ids for d in required_docs):
-            score += 2
-            reasons.append("Docs manquants")
-        if s.status == "IN_TRANSIT":
-            score += 1
-            reasons.append("En transit")
-        if "eta" in field_names:
-            if getattr(s, "eta", None) and s.eta < now.date():
-                score += 1
-                reasons.append("ETA depassee")
-        else:
-            if s.created_at.date() < now.date() - timedelta(days=transit_days):
-                score += 1
-                reasons.append("Ancien")
-        if score:
-            risk_items.append({
-                "shipment": s,
-                "score": score,
-                "reasons": ", ".join(reasons),
-            })
-    risk_items = sorted(risk_items, key=lambda x: x["score"], reverse=True)[:5]
-
-    risks_count = len(risk_items)
+    # Risk scoring and document coverage, computed in SQL over every active shipment
+    scored_qs = annotate_risk(active_qs, required_docs, now.date())
+    summary = risk_summary(scored_qs, required_docs)
+    missing_docs_count = summary["missing_docs"]
+    risk_items = top_risks(scored_qs, int(getattr(settings, "DIRECTION_RISK_TOP_N", 5)))
+    risks_count = summary["at_risk"]
 
     # Quality
     status_breakdown = list(visible.values("status").annotate(count=Count("id")).order_by("-count"))
     docs_quality = None
-    if required_docs and active_qs.exists():
-        try:
-            total_active = active_qs.count()
-            bl_have = len({sid for sid, dt in doc_ids if dt == "BL"})
-            inv_have = len({sid for sid, dt in doc_ids if dt == "INVOICE"})
-            docs_quality = {
-                "bl_pct": round((bl_have / total_active) * 100, 1) if total_active else None,
-                "inv_pct": round((inv_have / total_active) * 100, 1) if total_active else None,
-            }
-        except Exception:
-            docs_quality = None
+    total_active = summary["total"]
+    if required_docs and total_active:
+        def _pct(doc_type):
+            have = summary.get(f"with_{doc_flag(doc_type)}")
+            return round((have / total_active) * 100, 1) if have is not None else None
+        docs_quality = {"bl_pct": _pct("BL"), "inv_pct": _pct("INVOICE")}
 
     # Activity week
     week_start = now - timedelta(days=7)
@@ -517,19 +635,28 @@ def direction_view(request):
     except Exception:
         chats_week = None
 
+    # Tendances par site, lues dans la table de faits (périmètre global uniquement)
+    site_totals = None
+    if _is_privileged(user):
+        trend_days = int(getattr(settings, "SITE_TRENDS_DAYS", 30))
+        today = timezone.localdate()
+        site_totals = sum_facts(site_trends(today - timedelta(days=trend_days - 1), today), by_site=True)
+
     context = {
-        "total_count": total_count,
-        "in_transit_count": in_transit_qs.count(),
-        "delivered_count": delivered_qs.count(),
-        "blocked_count": blocked_count,
+        "total_count": stats.total,
+        "in_transit_count": stats.in_transit,
+        "delivered_count": stats.delivered,
+        "blocked_count": stats.blocked,
         "missing_docs_count": missing_docs_count,
-        "total_value": total_value,
+        "total_value": stats.total_value,
         "risks_count": risks_count,
         "risk_items": risk_items,
         "status_breakdown": status_breakdown,
         "docs_quality": docs_quality,
         "docs_week": docs_week,
         "chats_week": chats_week,
+        "site_totals": site_totals,
+        "trend_days": getattr(settings, "SITE_TRENDS_DAYS", 30),
     }
     return render(request, "ui/direction.html", context)
 
@@ -590,98 +717,55 @@ def shipment_detail(request, shipment_id: int):
     # Historique (Vérifie que le nom du modèle est bien ShipmentUpdate)
     updates = ShipmentUpdate.objects.filter(shipment=shipment).order_by("-created_at")
 
-    def get_avatar_url(author, req=None):
-        if not author:
-            return None
-        # A) primary avatar field
-        avatar = getattr(author, "avatar", None)
-        if avatar:
-            try:
-                url = avatar.url
-                if url:
-                    return url
-            except Exception:
-                pass
-        # B) local avatar field
-        local_avatar = getattr(author, "local_avatar", None)
-        if local_avatar:
-            try:
-                url = local_avatar.url
-                if url:
-                    return url
-            except Exception:
-                pass
-        # C) precomputed property
-        url = getattr(author, "avatar_url", None)
-        if url:
-            return url
-        return None
-
-    chat_messages = ChatMessage.objects.filter(shipment=shipment).select_related("author").order_by("created_at")
-    chat_messages_ui = []
-    prev_author_id = None
-    prev_date = None
-    for m in chat_messages:
-        author = getattr(m, "author", None)
-        full = ""
-        if author:
-            try:
-                full = (author.get_full_name() or "").strip()
-            except Exception:
-                full = ""
-        if full:
-            author_name = full
-        else:
-            first = (getattr(author, "first_name", "") or "").strip() if author else ""
-            last = (getattr(author, "last_name", "") or "").strip() if author else ""
-            if first or last:
-                author_name = f"{first} {last}".strip()
-            else:
-                email = (getattr(author, "email", "") or "").strip() if author else ""
-                author_name = email.split("@")[0] if email and "@" in email else (email or "Utilisateur")
-
-        initials_source = author_name or "U"
-        initials = initials_source[:2].upper()
-
-        avatar_url = get_avatar_url(author, request)
-
-        msg_date = m.created_at.date() if m.created_at else None
-        show_date_separator = bool(msg_date and msg_date != prev_date)
-        show_avatar = bool(author and author.pk != prev_author_id)
-
-        chat_messages_ui.append({
-            "author_name": author_name,
-            "initials": initials,
-            "avatar_url": avatar_url,
-            "body": m.body,
-            "created_at": m.created_at,
-            "date_label": m.created_at.strftime("%d/%m/%Y") if m.created_at else "",
-            "show_date_separator": show_date_separator,
-            "show_avatar": show_avatar,
-            "is_me": author == user,
-        })
-
-        prev_author_id = author.pk if author else None
-        prev_date = msg_date
+    chat_qs = ChatMessage.objects.filter(shipment=shipment).select_related("author")
+    chat_page = latest_messages(chat_qs)
+    chat_messages_ui = build_chat_messages_ui(chat_page.messages, user, previous=chat_page.previous)
+    if chat_page.messages:
+        mark_read(user, shipment.pk, ChatReadCursor.CHANNEL_TEAM, chat_page.messages[-1])
 
     return render(request, "ui/shipment_info.html", {
         "shipment": shipment,
         "items": items,
         "documents": docs,
         "chat_messages": chat_messages_ui,
+        "chat_page": chat_page,
+        "chat_count": shipment.chat_count,
         "updates": updates, # On passe l'historique au template
         "focus_chat": request.GET.get("focus") == "chat",
     })
 
 
 
+@login_required
+def shipment_chat_messages(request, shipment_id: int):
+    """Messages du chat d'équipe par curseur (historique et nouveaux messages)"""
+    if getattr(request.user, "role", "") == "CLIENT":
+        raise Http404
+    shipment = get_object_or_404(get_visible_shipments(request.user), pk=shipment_id)
+    return chat_messages_response(
+        request, ChatMessage.objects.filter(shipment=shipment).select_related("author"), ChatReadCursor.CHANNEL_TEAM, shipment.pk
+    )
+
+
+@login_required
+def shipment_chat_stream(request, shipment_id: int):
+    """Flux SSE du chat d'équipe"""
+    if getattr(request.user, "role", "") == "CLIENT":
+        raise Http404
+    shipment = get_object_or_404(get_visible_shipments(request.user), pk=shipment_id)
+    return chat_stream_response(
+        request,
+        ChatMessage.objects.filter(shipment=shipment).select_related("author"),
+        ChatReadCursor.CHANNEL_TEAM,
+        shipment.pk,
+    )
+
+
 @login_required
 def shipments_list(request):
     visible = get_visible_shipments(request.user)
-    paginator = Paginator(visible.order_by("-created_at"), 20)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-    
+    page_obj = keyset_page(visible, request.GET, per_page=20)
+
     for s in page_obj: 
         s.status_label = STATUS_LABELS.get(s.status, s.status)
         
@@ -701,42 +785,13 @@ def client_portal(request):
             "is_client_portal": True,
         })
 
-    q = (request.GET.get("q") or "").strip()
-    status_filter = (request.GET.get("status") or "").strip()
-    dest_filter = (request.GET.get("destination") or "").strip()
-
-    shipments = get_client_shipments(user).order_by("-created_at")
-    if q:
-        shipments = shipments.filter(
-            Q(container_no__icontains=q) |
-            Q(bl_no__icontains=q) |
-            Q(client_name__icontains=q)
-        )
-    if status_filter and status_filter != "ALL":
-        shipments = shipments.filter(status=status_filter)
-    if dest_filter and dest_filter != "ALL":
-        shipments = shipments.filter(destination_site=dest_filter)
+    q, status_filter, dest_filter = get_shipment_filters(request)
+    shipments = filter_shipments(get_client_shipments(user).order_by("-created_at"), q, status_filter, dest_filter)
 
     shipments = list(shipments[:50])
-    updates = ShipmentUpdate.objects.filter(shipment__in=shipments).order_by("-created_at")
-    latest_by_shipment = {}
-    for u in updates:
-        if u.shipment_id not in latest_by_shipment:
-            latest_by_shipment[u.shipment_id] = u.created_at
-    doc_counts = {}
-    try:
-        doc_counts = {
-            row["linked_shipment_id"]: row["count"]
-            for row in Document.objects.filter(linked_shipment__in=shipments)
-            .values("linked_shipment_id")
-            .annotate(count=Count("id"))
-        }
-    except Exception:
-        doc_counts = {}
-    for s in shipments:
-        s.last_update = latest_by_shipment.get(s.id, s.created_at)
-        s.docs_count = doc_counts.get(s.id, 0)
     for s in shipments:
+        # last_update_at / docs_count sont des colonnes de synthèse (core.summary).
+        s.last_update = s.last_update_at or s.created_at
         s.status_label = STATUS_LABELS.get(s.status, s.status)
 
     status_options = [choice[0] for choice in getattr(ContainerShipment, "STATUS_CHOICES", [])]
@@ -747,9 +802,7 @@ def client_portal(request):
         .values_list("destination_site", flat=True)
         .distinct()
     )
-    total_count = get_client_shipments(user).count()
-    in_transit_count = get_client_shipments(user).filter(status="IN_TRANSIT").count()
-    delivered_count = get_client_shipments(user).filter(status="DELIVERED").count()
+    stats = get_client_stats(user)
     return render(request, "ui/client_portal.html", {
         "shipments": shipments,
         "q": q,
@@ -757,9 +810,9 @@ def client_portal(request):
         "destination_filter": dest_filter or "ALL",
         "status_options": status_options,
         "destination_options": destination_options,
-        "total_count": total_count,
-        "in_transit_count": in_transit_count,
-        "delivered_count": delivered_count,
+        "total_count": stats.total,
+        "in_transit_count": stats.in_transit,
+        "delivered_count": stats.delivered,
         "is_client_portal": True,
     })
 
@@ -774,19 +827,14 @@ def dashboard_client(request):
     if not getattr(user, "client", None):
         return render(request, "ui/client_portal.html", {"client_missing": True, "is_client_portal": True})
 
-    shipments = get_client_shipments(user)
-    today = timezone.now().date()
-    total_count = shipments.count()
-    in_transit_count = shipments.filter(status="IN_TRANSIT").count()
-    delivered_count = shipments.filter(status="DELIVERED").count()
-    late_count = shipments.filter(status="IN_TRANSIT", eta__lt=today).count()
-    containers = shipments.order_by("-created_at")[:20]
+    stats = get_client_stats(user)
+    containers = get_client_shipments(user).order_by("-created_at")[:20]
 
     return render(request, "client/dashboard.html", {
-        "total_count": total_count,
-        "in_transit_count": in_transit_count,
-        "delivered_count": delivered_count,
-        "late_count": late_count,
+        "total_count": stats.total,
+        "in_transit_count": stats.in_transit,
+        "delivered_count": stats.delivered,
+        "late_count": stats.late,
         "containers": containers,
     })
 
@@ -801,10 +849,7 @@ def containers_list(request):
     if not getattr(user, "client", None):
         return render(request, "ui/client_portal.html", {"client_missing": True, "is_client_portal": True})
 
-    shipments = get_client_shipments(user).order_by("-created_at")
-    paginator = Paginator(shipments, 20)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    page_obj = keyset_page(get_client_shipments(user), request.GET, per_page=20)
     return render(request, "client/containers_list.html", {"page_obj": page_obj})
 
 
@@ -831,12 +876,41 @@ def container_detail(request, id: int):
             )
         return redirect(f"/client/containers/{id}/")
 
-    messages_qs = ClientChatMessage.objects.filter(shipment=container).select_related("author").order_by("created_at")
-    chat_messages_ui = build_chat_messages_ui(messages_qs, user)
+    messages_qs = ClientChatMessage.objects.filter(shipment=container).select_related("author")
+    chat_page = latest_messages(messages_qs)
+    chat_messages_ui = build_chat_messages_ui(chat_page.messages, user, previous=chat_page.previous)
+    if chat_page.messages:
+        mark_read(user, container.pk, ChatReadCursor.CHANNEL_CLIENT, chat_page.messages[-1])
     return render(
         request,
         "client/container_detail.html",
-        {"container": container, "chat_messages": chat_messages_ui},
+        {"container": container, "chat_messages": chat_messages_ui, "chat_page": chat_page},
+    )
+
+
+@login_required
+@client_required
+def client_container_chat_messages(request, id: int):
+    """Messages du chat client par curseur (historique et nouveaux messages)"""
+    container = get_object_or_404(get_client_shipments(request.user), pk=id)
+    return chat_messages_response(
+        request,
+        ClientChatMessage.objects.filter(shipment=container).select_related("author"),
+        ChatReadCursor.CHANNEL_CLIENT,
+        container.pk,
+    )
+
+
+@login_required
+@client_required
+def client_container_chat_stream(request, id: int):
+    """Flux SSE du chat client"""
+    container = get_object_or_404(get_client_shipments(request.user), pk=id)
+    return chat_stream_response(
+        request,
+        ClientChatMessage.objects.filter(shipment=container).select_related("author"),
+        ChatReadCursor.CHANNEL_CLIENT,
+        container.pk,
     )
 
 
@@ -1020,4 +1094,28 @@ def reports_view(request):
     role = getattr(request.user, 'role', 'USER')
     if role not in ("BOSS", "HQ_ADMIN"):
         return redirect("/dashboard/")
-    return render(request, "ui/reports.html", {"today": timezone.localdate()})
+    today = timezone.localdate()
+    period = request.GET.get("period") or "week"
+    if period not in ("week", "month"):
+        period = "week"
+    start_date = today - timedelta(days=6 if period == "week" else 29)
+    # Flux quotidiens issus de SiteDailyFact ; "en transit" est un état courant.
+    rows = site_trends(start_date, today)
+    day_facts = sum_facts([row for row in rows if row["day"] == today])
+    period_facts = sum_facts(rows)
+    in_transit = get_shipment_stats("global", ContainerShipment.objects.all()).in_transit
+    return render(request, "ui/reports.html", {
+        "today": today,
+        "period": period,
+        "period_label": "Semaine" if period == "week" else "Mois",
+        "start_date": start_date,
+        "day_total": day_facts["shipments_created"],
+        "day_in_transit": in_transit,
+        "day_delivered": day_facts["shipments_delivered"],
+        "day_value": day_facts["value_shipped"],
+        "period_total": period_facts["shipments_created"],
+        "period_in_transit": in_transit,
+        "period_delivered": period_facts["shipments_delivered"],
+        "period_value": period_facts["value_shipped"],
+        "site_totals": sum_facts(rows, by_site=True),
+    })
@@ -4,6 +4,7 @@ from django.db import models
 from django.conf import settings
 from django.utils.text import get_valid_filename, slugify
 
+from audit.utils import LoadedStateMixin
 from logistics.models import ContainerShipment
 from supply.models import PurchaseOrder
 
@@ -24,7 +25,7 @@ def generate_share_token() -> str:
     return secrets.token_urlsafe(32)
 
 
-class Document(models.Model):
+class Document(LoadedStateMixin, models.Model):
     DOC_TYPE_CHOICES = [
         ("BL", "Bill of Lading"),
         ("INVOICE", "Invoice"),
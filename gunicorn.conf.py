@@ -0,0 +1,35 @@
+"""Gunicorn settings shared by the Dockerfile and the Procfile."""
+import multiprocessing
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# Chat streams (server-sent events) hold a thread each, for up to SSE_MAX_SECONDS;
+# each worker accepts at most SSE_MAX_STREAMS of them (default 8) so the rest of
+# its threads keep serving pages. Capacity is workers x SSE_MAX_STREAMS streams.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "16"))
+# Several workers only see each other's chat messages through Redis pub/sub, so
+# the in-process broker keeps the default at one worker.
+_realtime = os.environ.get("REALTIME_BACKEND", "redis" if os.getenv("REDIS_URL") else "memory")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1 if _realtime == "redis" else 1))
+accesslog = "-"
+errorlog = "-"
+
+# Prometheus multiprocess mode: workers write their samples here and /metrics
+# aggregates them. Must be set before the workers import prometheus_client.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/fagouflow-metrics")
+
+
+def on_starting(server):
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
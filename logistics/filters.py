@@ -1,11 +1,16 @@
 import django_filters
 from .models import ContainerShipment
+from .search import search_shipments
 
 
 class ShipmentFilter(django_filters.FilterSet):
+    q = django_filters.CharFilter(method="filter_q")
     eta_after = django_filters.DateFilter(field_name="eta", lookup_expr="gte")
     eta_before = django_filters.DateFilter(field_name="eta", lookup_expr="lte")
 
     class Meta:
         model = ContainerShipment
-        fields = ["status", "destination_site"]
\ No newline at end of file
+        fields = ["status", "destination_site"]
+
+    def filter_q(self, queryset, name, value):
+        return search_shipments(queryset, value)
\ No newline at end of file
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+SEARCH_COLUMNS = ("container_no", "bl_no", "client_name")
+
+
+def _index_name(column):
+    return f"logistics_shipment_{column}_trgm"
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {_index_name(column)} "
+            f"ON logistics_containershipment USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {_index_name(column)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0002_containershipment_client"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
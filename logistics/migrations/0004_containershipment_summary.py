@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0003_shipment_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="containershipment",
+            name="chat_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="containershipment",
+            name="docs_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="containershipment",
+            name="last_update_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="containershipment",
+            name="total_value",
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+    ]
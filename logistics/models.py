@@ -1,10 +1,12 @@
 import uuid
-from django.db import models
+from contextlib import nullcontext
+from django.db import DatabaseError, connections, models, router, transaction
 from django.conf import settings
 
+from audit.utils import LoadedStateMixin
 from supply.models import Product
 
-class ContainerShipment(models.Model):
+class ContainerShipment(LoadedStateMixin, models.Model):
     STATUS_CHOICES = [
         ("CREATED", "Created"),
         ("IN_TRANSIT", "In Transit"),
@@ -31,10 +33,38 @@ class ContainerShipment(models.Model):
     client = models.ForeignKey("core.Client", on_delete=models.SET_NULL, null=True, blank=True, related_name="shipments")
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Summary columns maintained by core.summary; never written by save().
+    last_update_at = models.DateTimeField(null=True, blank=True, editable=False)
+    docs_count = models.PositiveIntegerField(default=0, editable=False)
+    chat_count = models.PositiveIntegerField(default=0, editable=False)
+    total_value = models.DecimalField(max_digits=14, decimal_places=2, default=0, editable=False)
+
+    SUMMARY_FIELDS = ("last_update_at", "docs_count", "chat_count", "total_value")
 
     def __str__(self):
         return self.container_no or self.bl_no or f"Shipment #{self.pk}"
 
+    def save(self, *args, **kwargs):
+        # An in-memory copy may hold stale counters; only the summary updates write them.
+        if args or self._state.adding or kwargs.get("update_fields") is not None or kwargs.get("force_insert"):
+            return super().save(*args, **kwargs)
+        kwargs["update_fields"] = [
+            f.name for f in self._meta.concrete_fields
+            if not f.primary_key and f.name not in self.SUMMARY_FIELDS
+        ]
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        # A failed save marks the enclosing transaction for rollback, hence the savepoint there.
+        guard = transaction.atomic(using=using) if connections[using].in_atomic_block else nullcontext()
+        try:
+            with guard:
+                super().save(**kwargs)
+        except DatabaseError:
+            # Same fallback as a plain save(): the row is gone, so insert it again.
+            if kwargs.get("force_update") or type(self)._base_manager.using(using).filter(pk=self.pk).exists():
+                raise
+            del kwargs["update_fields"]
+            super().save(force_insert=True, **kwargs)
+
 
 class ContainerItem(models.Model):
     shipment = models.ForeignKey(ContainerShipment, on_delete=models.CASCADE, related_name="items")
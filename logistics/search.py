@@ -0,0 +1,45 @@
+"""Ranked shipment search shared by the dashboard, the client portal and the API.
+
+Matches are case-insensitive substring lookups on the container number, the
+BL number and the client name. On PostgreSQL they are served by the
+``UPPER(col::text) gin_trgm_ops`` indexes created in
+logistics/migrations/0003_shipment_search_indexes.py (Django compiles
+``icontains``/``istartswith``/``iexact`` to ``UPPER(col::text) LIKE UPPER(...)``);
+SQLite runs the same query without them.
+"""
+from __future__ import annotations
+
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+
+SEARCH_FIELDS = ("container_no", "bl_no", "client_name")
+REFERENCE_FIELDS = ("container_no", "bl_no")
+
+
+def _any(fields, lookup: str, term: str) -> Q:
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f"{field}__{lookup}": term})
+    return condition
+
+
+def search_shipments(qs: QuerySet, q: str) -> QuerySet:
+    """Filter ``qs`` on ``q`` and order by relevance, then newest first.
+
+    Exact container/BL numbers rank first, then container/BL prefixes, then
+    any other substring match.
+    """
+    term = (q or "").strip()
+    if not term:
+        return qs
+    rank = Case(
+        When(_any(REFERENCE_FIELDS, "iexact", term), then=Value(0)),
+        When(_any(REFERENCE_FIELDS, "istartswith", term), then=Value(1)),
+        When(client_name__istartswith=term, then=Value(2)),
+        default=Value(3),
+        output_field=IntegerField(),
+    )
+    return (
+        qs.filter(_any(SEARCH_FIELDS, "icontains", term))
+        .annotate(search_rank=rank)
+        .order_by("search_rank", "-created_at", "-id")
+    )
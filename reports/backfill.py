@@ -0,0 +1,26 @@
+"""Worker functions for generating many audit report files in a process pool.
+
+Model imports are deferred so the module can be loaded by spawned workers
+before Django is set up.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+
+def init_worker() -> None:
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def build_report_file(period: str, params: Dict[str, str], force: bool = False) -> Optional[str]:
+    """Build and write one report; returns the file path, or None if it already existed."""
+    from .utils import _date_range_for_period, build_audit_report, report_path, write_report_file
+
+    _start, _end, label = _date_range_for_period(period, params)
+    if not force and report_path(period, label).exists():
+        return None
+    return str(write_report_file(period, build_audit_report(period, params)))
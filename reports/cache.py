@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone as dj_timezone
+
+from core.metrics import record_cache
+
+from .utils import _date_range_for_period, build_audit_report, report_path
+
+
+@dataclass
+class CachedReport:
+    data: Dict[str, Any]
+    etag: str
+    last_modified: Optional[datetime]
+    final: bool
+
+
+def _canonical(report: Dict[str, Any]) -> Dict[str, Any]:
+    # Same representation whether the report is fresh, cached or read from disk.
+    return json.loads(json.dumps(report, cls=DjangoJSONEncoder))
+
+
+def _etag(data: Dict[str, Any]) -> str:
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha1(payload).hexdigest()
+
+
+def _load_artifact(period: str, label: str, closed_at: datetime) -> Optional[Dict[str, Any]]:
+    path = report_path(period, label)
+    try:
+        # A file written before the period closed may be incomplete.
+        if datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc) < closed_at:
+            return None
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def get_audit_report(period: str, params: Dict[str, Any], scope: str = "global") -> CachedReport:
+    """Return an audit report, serving finished periods from cache or the stored artifact.
+
+    Only the period that is still open is computed on every call. Stored
+    artifacts written by ``generate_audit_report`` cover the global scope.
+    """
+    start, end, label = _date_range_for_period(period, params)
+    if end > dj_timezone.now():
+        data = _canonical(build_audit_report(period, params))
+        return CachedReport(data=data, etag=_etag(data), last_modified=None, final=False)
+
+    key = f"audit_report:{period}:{label}:{scope}"
+    cached = cache.get(key)
+    record_cache("audit_report", cached is not None)
+    if cached is not None:
+        return cached
+    data = _load_artifact(period, label, end) if scope == "global" else None
+    if data is None:
+        data = _canonical(build_audit_report(period, params))
+    report = CachedReport(data=data, etag=_etag(data), last_modified=end, final=True)
+    cache.set(key, report, getattr(settings, "REPORTS_CACHE_TTL", 86400))
+    return report
@@ -0,0 +1,139 @@
+"""ETL of the per-site daily activity facts (``SiteDailyFact``).
+
+Each source table is grouped by day and site in a single query over the
+whole range; ``refresh_site_facts`` then replaces the stored rows of those
+days, so re-running it for a day is idempotent and picks up late rows.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from chat.models import ChatMessage
+from documents.models import Document
+from logistics.models import ContainerShipment, StatusHistory
+from stock.models import Sale, StockMovement
+from .models import SiteDailyFact
+
+FACT_FIELDS = (
+    "shipments_created",
+    "shipments_delivered",
+    "value_shipped",
+    "documents_uploaded",
+    "chat_messages",
+    "stock_in_qty",
+    "stock_out_qty",
+    "sales_count",
+    "sales_value",
+)
+MONEY_FIELDS = ("value_shipped", "sales_value")
+
+FactKey = Tuple[date, str]
+
+
+def _bounds(date_from: date, date_to: date) -> Tuple[datetime, datetime]:
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    return start, end
+
+
+def _grouped(queryset, date_field: str, site_field: str, start: datetime, end: datetime, **aggregates):
+    return (
+        queryset.filter(**{f"{date_field}__gte": start, f"{date_field}__lt": end})
+        .annotate(fact_day=TruncDate(date_field), fact_site=Coalesce(site_field, Value("")))
+        .order_by()
+        .values("fact_day", "fact_site")
+        .annotate(**aggregates)
+    )
+
+
+def collect_site_facts(date_from: date, date_to: date) -> Dict[FactKey, Dict[str, Any]]:
+    """Fact values per (day, site) computed from the operational tables."""
+    start, end = _bounds(date_from, date_to)
+    money = DecimalField(max_digits=16, decimal_places=2)
+    sources = [
+        _grouped(
+            ContainerShipment.objects.all(), "created_at", "destination_site", start, end,
+            shipments_created=Count("id"),
+            value_shipped=Sum("total_value"),
+        ),
+        _grouped(
+            StatusHistory.objects.filter(to_status="DELIVERED"), "changed_at", "shipment__destination_site", start, end,
+            shipments_delivered=Count("shipment", distinct=True),
+        ),
+        _grouped(
+            Document.objects.all(), "uploaded_at", "linked_shipment__destination_site", start, end,
+            documents_uploaded=Count("id"),
+        ),
+        _grouped(ChatMessage.objects.all(), "created_at", "site", start, end, chat_messages=Count("id")),
+        _grouped(
+            StockMovement.objects.all(), "created_at", "site", start, end,
+            stock_in_qty=Sum("qty", filter=Q(movement_type="IN")),
+            stock_out_qty=Sum("qty", filter=Q(movement_type="OUT")),
+        ),
+        _grouped(
+            Sale.objects.all(), "created_at", "site", start, end,
+            sales_count=Count("id", distinct=True),
+            sales_value=Sum(F("lines__qty") * F("lines__unit_price"), output_field=money),
+        ),
+    ]
+    facts: Dict[FactKey, Dict[str, Any]] = {}
+    for rows in sources:
+        for row in rows:
+            day, site = row.pop("fact_day"), row.pop("fact_site")
+            values = facts.setdefault((day, site), {})
+            values.update({name: value for name, value in row.items() if value is not None})
+    return facts
+
+
+def refresh_site_facts(date_from: date, date_to: date) -> int:
+    """Recompute and replace the stored facts of every day in the range; returns the row count."""
+    facts = collect_site_facts(date_from, date_to)
+    rows = [SiteDailyFact(day=day, site=site, **values) for (day, site), values in facts.items()]
+    with transaction.atomic():
+        SiteDailyFact.objects.filter(day__gte=date_from, day__lte=date_to).delete()
+        SiteDailyFact.objects.bulk_create(rows)
+    return len(rows)
+
+
+def _empty() -> Dict[str, Any]:
+    return {name: Decimal("0") if name in MONEY_FIELDS else 0 for name in FACT_FIELDS}
+
+
+def site_trends(date_from: date, date_to: date, site: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Daily fact rows, oldest first.
+
+    Past days are read from ``SiteDailyFact``; today is still open and is
+    computed live so the trend always ends with current figures.
+    """
+    today = timezone.localdate()
+    facts: Dict[FactKey, Dict[str, Any]] = {}
+    stored = SiteDailyFact.objects.filter(day__gte=date_from, day__lte=min(date_to, today - timedelta(days=1)))
+    if site is not None:
+        stored = stored.filter(site=site)
+    for row in stored.values("day", "site", *FACT_FIELDS):
+        facts[(row.pop("day"), row.pop("site"))] = row
+    if date_from <= today <= date_to:
+        for (day, fact_site), values in collect_site_facts(today, today).items():
+            if site is None or fact_site == site:
+                facts[(day, fact_site)] = {**_empty(), **values}
+    return [{"day": day, "site": fact_site, **values} for (day, fact_site), values in sorted(facts.items())]
+
+
+def sum_facts(rows: List[Dict[str, Any]], by_site: bool = False):
+    """Totals of the fact rows, overall or as a {site: totals} mapping."""
+    totals = defaultdict(_empty)
+    for row in rows:
+        target = totals[row["site"] if by_site else None]
+        for name in FACT_FIELDS:
+            target[name] += row[name]
+    if by_site:
+        return dict(sorted(totals.items()))
+    return totals[None]
@@ -1,10 +1,12 @@
-import json
-from pathlib import Path
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
 
-from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 
-from reports.utils import build_audit_report
+from reports.backfill import build_report_file, init_worker
+from reports.utils import build_audit_report, period_params_between, write_report_file
 
 
 class Command(BaseCommand):
@@ -16,13 +18,48 @@ class Command(BaseCommand):
         parser.add_argument("--year")
         parser.add_argument("--week")
         parser.add_argument("--month")
+        parser.add_argument("--from", dest="date_from", help="Range mode: first day (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", help="Range mode: last day, inclusive (YYYY-MM-DD)")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Range mode: worker processes")
+        parser.add_argument("--force", action="store_true", help="Range mode: rebuild reports that already exist")
 
     def handle(self, *args, **options):
         period = options["period"]
+        if options["date_from"] or options["date_to"]:
+            return self._handle_range(period, options)
         params = {k: v for k, v in options.items() if k in {"date", "year", "week", "month"} and v}
         report = build_audit_report(period, params)
-        output_dir = Path(settings.REPORTS_OUTPUT_DIR)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        filename = output_dir / f"audit_{period}_{report['period']}.json"
-        filename.write_text(json.dumps(report, default=str, indent=2))
-        self.stdout.write(self.style.SUCCESS(f"Report written to {filename}"))
\ No newline at end of file
+        filename = write_report_file(period, report)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {filename}"))
+
+    def _handle_range(self, period, options):
+        if not (options["date_from"] and options["date_to"]):
+            raise CommandError("--from and --to must be given together")
+        try:
+            date_from = date.fromisoformat(options["date_from"])
+            date_to = date.fromisoformat(options["date_to"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        all_params = period_params_between(period, date_from, date_to)
+        force = options["force"]
+        workers = max(1, min(options["workers"], len(all_params) or 1))
+
+        written = skipped = 0
+        if workers == 1:
+            results = (build_report_file(period, params, force) for params in all_params)
+            for filename in results:
+                written, skipped = self._report(filename, written, skipped)
+        else:
+            # Children open their own connections; don't hand them ours.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+                futures = [pool.submit(build_report_file, period, params, force) for params in all_params]
+                for future in as_completed(futures):
+                    written, skipped = self._report(future.result(), written, skipped)
+        self.stdout.write(self.style.SUCCESS(f"{written} reports written, {skipped} already present"))
+
+    def _report(self, filename, written, skipped):
+        if filename is None:
+            return written, skipped + 1
+        self.stdout.write(f"Report written to {filename}")
+        return written + 1, skipped
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from reports.facts import refresh_site_facts
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-site daily facts of recent days (or of an explicit range)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Recompute the last N days, today included")
+        parser.add_argument("--from", dest="date_from", help="First day (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="date_to", help="Last day, inclusive (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        if options["date_from"] or options["date_to"]:
+            if not (options["date_from"] and options["date_to"]):
+                raise CommandError("--from and --to must be given together")
+            try:
+                date_from = date.fromisoformat(options["date_from"])
+                date_to = date.fromisoformat(options["date_to"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        else:
+            days = options["days"] or getattr(settings, "SITE_FACTS_REFRESH_DAYS", 7)
+            date_from, date_to = today - timedelta(days=max(1, days) - 1), today
+        if date_from > date_to:
+            raise CommandError("--from must not be after --to")
+        rows = refresh_site_facts(date_from, date_to)
+        self.stdout.write(self.style.SUCCESS(f"{rows} site facts written for {date_from} to {date_to}"))
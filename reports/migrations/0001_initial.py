@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SiteDailyFact",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("site", models.CharField(blank=True, max_length=10)),
+                ("shipments_created", models.PositiveIntegerField(default=0)),
+                ("shipments_delivered", models.PositiveIntegerField(default=0)),
+                ("value_shipped", models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ("documents_uploaded", models.PositiveIntegerField(default=0)),
+                ("chat_messages", models.PositiveIntegerField(default=0)),
+                ("stock_in_qty", models.IntegerField(default=0)),
+                ("stock_out_qty", models.IntegerField(default=0)),
+                ("sales_count", models.PositiveIntegerField(default=0)),
+                ("sales_value", models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["site", "day"], name="site_daily_fact_site_day_idx")],
+                "constraints": [models.UniqueConstraint(fields=("day", "site"), name="site_daily_fact_day_site_uniq")],
+            },
+        ),
+    ]
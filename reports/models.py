@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class SiteDailyFact(models.Model):
+    """Activity of one site on one day, filled by ``refresh_site_facts``."""
+
+    day = models.DateField()
+    site = models.CharField(max_length=10, blank=True)
+    shipments_created = models.PositiveIntegerField(default=0)
+    shipments_delivered = models.PositiveIntegerField(default=0)
+    value_shipped = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    documents_uploaded = models.PositiveIntegerField(default=0)
+    chat_messages = models.PositiveIntegerField(default=0)
+    stock_in_qty = models.IntegerField(default=0)
+    stock_out_qty = models.IntegerField(default=0)
+    sales_count = models.PositiveIntegerField(default=0)
+    sales_value = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["day", "site"], name="site_daily_fact_day_site_uniq")]
+        indexes = [models.Index(fields=["site", "day"], name="site_daily_fact_site_day_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.day:%Y-%m-%d} {self.site or '-'}"
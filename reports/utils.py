@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
-from typing import Dict, Any
+import json
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, List
 
-from django.db.models import Count
-from django.utils import timezone
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Sum
 
-from audit.models import AuditEvent
+from audit.models import AuditEvent, AuditHourlyRollup
 
 
 def _date_range_for_period(period: str, params: Dict[str, Any]):
@@ -35,27 +38,65 @@ def _date_range_for_period(period: str, params: Dict[str, Any]):
     return start, end, label
 
 
+def period_params_between(period: str, date_from: date, date_to: date) -> List[Dict[str, str]]:
+    """Params of every ``period`` touching the days from ``date_from`` to ``date_to`` (inclusive)."""
+    seen = []
+    day = date_from
+    while day <= date_to:
+        if period == "daily":
+            params = {"date": day.isoformat()}
+        elif period == "weekly":
+            year, week, _ = day.isocalendar()
+            params = {"year": str(year), "week": str(week)}
+        elif period == "monthly":
+            params = {"year": str(day.year), "month": str(day.month)}
+        else:
+            raise ValueError("Invalid period")
+        if params not in seen:
+            seen.append(params)
+        day += timedelta(days=1)
+    return seen
+
+
 def build_audit_report(period: str, params: Dict[str, Any]):
-    """Build aggregated audit metrics for a time period."""
+    """Build aggregated audit metrics for a time period from the hourly rollups."""
     start, end, label = _date_range_for_period(period, params)
-    base_qs = AuditEvent.objects.filter(created_at__gte=start, created_at__lt=end)
+    rollups = AuditHourlyRollup.objects.filter(hour__gte=start, hour__lt=end)
 
-    events_by_action = dict(base_qs.values("action").annotate(count=Count("id")).values_list("action", "count"))
-    events_by_site = dict(base_qs.values("site").annotate(count=Count("id")).values_list("site", "count"))
+    events_by_action = dict(
+        rollups.values("action").annotate(count=Sum("event_count")).order_by().values_list("action", "count")
+    )
+    events_by_site = dict(
+        rollups.values("site").annotate(count=Sum("event_count")).order_by().values_list("site", "count")
+    )
     top_users = list(
-        base_qs.values("actor__email")
-        .annotate(count=Count("id"))
+        rollups.values("actor__email")
+        .annotate(count=Sum("event_count"))
         .order_by("-count")[:10]
     )
     last_events = list(
-        base_qs.order_by("-created_at")[:50].values("id", "action", "entity_type", "entity_id", "site", "summary", "created_at")
+        AuditEvent.objects.filter(created_at__gte=start, created_at__lt=end)
+        .order_by("-created_at")[:50]
+        .values("id", "action", "entity_type", "entity_id", "site", "summary", "created_at")
     )
 
     return {
         "period": label,
-        "total_events": base_qs.count(),
+        "total_events": sum(events_by_action.values()),
         "events_by_action": events_by_action,
         "events_by_site": events_by_site,
         "top_users": top_users,
         "last_events": last_events,
     }
+
+
+def report_path(period: str, label: str) -> Path:
+    return Path(settings.REPORTS_OUTPUT_DIR) / f"audit_{period}_{label}.json"
+
+
+def write_report_file(period: str, report: Dict[str, Any]) -> Path:
+    """Write a report as JSON under REPORTS_OUTPUT_DIR and return the file path."""
+    filename = report_path(period, report["period"])
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    filename.write_text(json.dumps(report, cls=DjangoJSONEncoder, indent=2))
+    return filename
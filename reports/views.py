@@ -1,8 +1,14 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date_safe, parse_etags, quote_etag
 from rest_framework import permissions, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .utils import build_audit_report
+from .cache import get_audit_report
+from .facts import site_trends, sum_facts
 
 
 class IsBossOrHQ(permissions.BasePermission):
@@ -10,6 +16,24 @@ class IsBossOrHQ(permissions.BasePermission):
         return request.user.role in {"BOSS", "HQ_ADMIN"}
 
 
+def _report_response(request, report):
+    etag = quote_etag(report.etag)
+    not_modified = False
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        not_modified = etag in parse_etags(if_none_match) or if_none_match.strip() == "*"
+    elif report.last_modified is not None:
+        since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+        not_modified = since is not None and since >= int(report.last_modified.timestamp())
+
+    response = Response(status=304) if not_modified else Response(report.data)
+    response["ETag"] = etag
+    if report.last_modified is not None:
+        response["Last-Modified"] = http_date(report.last_modified.timestamp())
+    response["Cache-Control"] = "private, max-age=3600" if report.final else "private, no-cache"
+    return response
+
+
 class AuditReportViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated, IsBossOrHQ]
 
@@ -18,8 +42,8 @@ class AuditReportViewSet(viewsets.ViewSet):
         date_value = request.query_params.get("date")
         if not date_value:
             return Response({"detail": "date is required"}, status=400)
-        report = build_audit_report("daily", {"date": date_value})
-        return Response(report)
+        report = get_audit_report("daily", {"date": date_value})
+        return _report_response(request, report)
 
     @action(detail=False, methods=["get"], url_path="weekly")
     def weekly(self, request):
@@ -27,8 +51,8 @@ class AuditReportViewSet(viewsets.ViewSet):
         week = request.query_params.get("week")
         if not year or not week:
             return Response({"detail": "year and week are required"}, status=400)
-        report = build_audit_report("weekly", {"year": year, "week": week})
-        return Response(report)
+        report = get_audit_report("weekly", {"year": year, "week": week})
+        return _report_response(request, report)
 
     @action(detail=False, methods=["get"], url_path="monthly")
     def monthly(self, request):
@@ -36,5 +60,30 @@ class AuditReportViewSet(viewsets.ViewSet):
         month = request.query_params.get("month")
         if not year or not month:
             return Response({"detail": "year and month are required"}, status=400)
-        report = build_audit_report("monthly", {"year": year, "month": month})
-        return Response(report)
+        report = get_audit_report("monthly", {"year": year, "month": month})
+        return _report_response(request, report)
+
+
+class SiteTrendViewSet(viewsets.ViewSet):
+    """Per-site daily facts between ``from`` and ``to`` (default: the last SITE_TRENDS_DAYS days)."""
+
+    permission_classes = [permissions.IsAuthenticated, IsBossOrHQ]
+
+    def list(self, request):
+        today = timezone.localdate()
+        try:
+            date_to = date.fromisoformat(request.query_params.get("to") or today.isoformat())
+            default_from = date_to - timedelta(days=getattr(settings, "SITE_TRENDS_DAYS", 30) - 1)
+            date_from = date.fromisoformat(request.query_params.get("from") or default_from.isoformat())
+        except ValueError:
+            return Response({"detail": "from and to must be YYYY-MM-DD"}, status=400)
+        if date_from > date_to or (date_to - date_from).days > 366:
+            return Response({"detail": "invalid date range"}, status=400)
+        rows = site_trends(date_from, date_to, site=request.query_params.get("site"))
+        return Response({
+            "from": date_from,
+            "to": date_to,
+            "rows": rows,
+            "totals": sum_facts(rows),
+            "by_site": sum_facts(rows, by_site=True),
+        })
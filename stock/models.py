@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 
+from audit.utils import LoadedStateMixin
 from logistics.models import ContainerShipment
 from supply.models import Product
 
@@ -17,7 +18,7 @@ class StockLocation(models.Model):
         return label or f"Location #{self.pk}"
 
 
-class StockMovement(models.Model):
+class StockMovement(LoadedStateMixin, models.Model):
     MOVEMENT_CHOICES = [
         ("IN", "In"),
         ("OUT", "Out"),
@@ -35,7 +36,7 @@ class StockMovement(models.Model):
     note = models.TextField(blank=True)
 
 
-class Sale(models.Model):
+class Sale(LoadedStateMixin, models.Model):
     SITE_CHOICES = [("PN", "PN"), ("DLA", "DLA"), ("KIN", "KIN")]
 
     site = models.CharField(max_length=10, choices=SITE_CHOICES)
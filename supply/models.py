@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from audit.utils import LoadedStateMixin
+
 
 class Supplier(models.Model):
     name = models.CharField(max_length=200)
@@ -27,7 +29,7 @@ class Product(models.Model):
         return label or f"Product #{self.pk}"
 
 
-class PurchaseOrder(models.Model):
+class PurchaseOrder(LoadedStateMixin, models.Model):
     STATUS_CHOICES = [
         ("DRAFT", "Draft"),
         ("SENT", "Sent"),
@@ -2,6 +2,7 @@ import pytest
 from rest_framework.test import APIClient
 
 from accounts.models import User
+from tests import factories
 
 
 @pytest.fixture()
@@ -17,4 +18,8 @@ def boss_user(db):
         full_name="Boss",
         role="BOSS",
         site="BE",
-    )
\ No newline at end of file
+    )
+
+@pytest.fixture()
+def make_shipment(db):
+    return factories.make_shipment
@@ -0,0 +1,15 @@
+"""Model factories shared by the pytest suites (tests/) and the Django TestCases (core/tests/)."""
+from logistics.models import ContainerShipment
+
+
+def make_shipment(container_no="CONT-1", site="PN", status="CREATED", **fields):
+    """Create a ContainerShipment with the required fields filled in."""
+    values = {
+        "bl_no": f"BL-{container_no}",
+        "origin_country": "CN",
+        "destination_type": "BRANCH_STOCK",
+        **fields,
+    }
+    return ContainerShipment.objects.create(
+        container_no=container_no, destination_site=site, status=status, **values
+    )
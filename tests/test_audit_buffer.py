@@ -0,0 +1,42 @@
+import pytest
+from django.db import transaction
+
+from audit.buffer import audit_buffer
+from audit.models import AuditEvent
+from logistics.models import ContainerShipment
+
+
+def test_buffer_writes_events_in_one_insert(db, django_capture_on_commit_callbacks, make_shipment):
+    with django_capture_on_commit_callbacks(execute=True):
+        with audit_buffer():
+            make_shipment("CONT-1")
+            make_shipment("CONT-2")
+            assert not AuditEvent.objects.exists()
+    assert AuditEvent.objects.filter(action="CREATE").count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_buffer_flushes_early_at_max_size(make_shipment):
+    with audit_buffer(max_size=2):
+        make_shipment("CONT-1")
+        assert AuditEvent.objects.count() == 0
+        make_shipment("CONT-2")
+        assert AuditEvent.objects.count() == 2
+        make_shipment("CONT-3")
+        assert AuditEvent.objects.count() == 2
+    assert AuditEvent.objects.count() == 3
+
+
+def test_buffer_drops_events_of_rolled_back_transaction(db, django_capture_on_commit_callbacks, make_shipment):
+    with django_capture_on_commit_callbacks(execute=True):
+        with audit_buffer():
+            try:
+                with transaction.atomic():
+                    make_shipment("CONT-1")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            make_shipment("CONT-2")
+    assert list(AuditEvent.objects.values_list("entity_id", flat=True)) == [
+        str(ContainerShipment.objects.get().pk)
+    ]
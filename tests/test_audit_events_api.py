@@ -0,0 +1,75 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+from django.utils import timezone
+
+from audit.models import AuditEvent
+
+
+def _event(entity_id, created_at):
+    event = AuditEvent.objects.create(action="SALE", entity_type="Sale", entity_id=entity_id, site="PN", summary="s")
+    AuditEvent.objects.filter(pk=event.pk).update(created_at=created_at)
+    return event
+
+
+def test_audit_events_are_cursor_paginated(api_client, boss_user):
+    api_client.force_authenticate(user=boss_user)
+    now = timezone.now()
+    for i in range(3):
+        _event(str(i), now - timedelta(minutes=i))
+
+    response = api_client.get("/api/audit-events/?page_size=2")
+    assert [e["entity_id"] for e in response.data["results"]] == ["0", "1"]
+    assert response.data["next"]
+
+    response = api_client.get(response.data["next"])
+    assert [e["entity_id"] for e in response.data["results"]] == ["2"]
+    assert response.data["next"] is None
+
+
+def test_audit_event_date_filters_are_inclusive_days(api_client, boss_user):
+    api_client.force_authenticate(user=boss_user)
+    today = timezone.localdate()
+    _event("today", timezone.now())
+    _event("yesterday", timezone.now() - timedelta(days=1))
+    _event("old", timezone.now() - timedelta(days=3))
+
+    response = api_client.get(f"/api/audit-events/?date_after={today - timedelta(days=1)}&date_before={today}")
+    assert {e["entity_id"] for e in response.data["results"]} == {"today", "yesterday"}
+    response = api_client.get(f"/api/audit-events/?date_before={today - timedelta(days=1)}")
+    assert {e["entity_id"] for e in response.data["results"]} == {"yesterday", "old"}
+
+
+def _streamed(response):
+    return b"".join(response.streaming_content)
+
+
+def test_export_streams_ndjson_and_csv(api_client, boss_user):
+    api_client.force_authenticate(user=boss_user)
+    today = timezone.localdate()
+    _event("a", timezone.now())
+    _event("b", timezone.now())
+    _event("old", timezone.now() - timedelta(days=3))
+
+    response = api_client.get(f"/api/audit-events/export/?from={today}&to={today}")
+    assert response["Content-Type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in _streamed(response).decode().splitlines()]
+    assert [line["entity_id"] for line in lines] == ["a", "b"]
+
+    response = api_client.get(f"/api/audit-events/export/?from={today}&fmt=csv")
+    rows = list(csv.reader(io.StringIO(_streamed(response).decode())))
+    assert rows[0][:3] == ["id", "created_at", "action"]
+    assert len(rows) == 3
+
+
+def test_export_gzips_when_accepted(api_client, boss_user):
+    api_client.force_authenticate(user=boss_user)
+    _event("a", timezone.now())
+    response = api_client.get(
+        f"/api/audit-events/export/?from={timezone.localdate()}", HTTP_ACCEPT_ENCODING="gzip"
+    )
+    assert response["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(_streamed(response)))["entity_id"] == "a"
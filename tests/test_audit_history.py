@@ -0,0 +1,42 @@
+from audit.history import entity_state_at, event_changes
+from audit.models import AuditEvent
+
+
+def test_update_stores_only_changed_fields(db, settings, make_shipment):
+    settings.AUDIT_STORAGE_MODE = "delta"
+    shipment = make_shipment()
+    shipment.status = "IN_TRANSIT"
+    shipment.save()
+    event = AuditEvent.objects.get(action="UPDATE")
+    assert event.before_json is None and event.after_json is None
+    assert event.changes_json == {"status": ["CREATED", "IN_TRANSIT"]}
+
+
+def test_full_mode_keeps_snapshots(db, settings, make_shipment):
+    settings.AUDIT_STORAGE_MODE = "full"
+    shipment = make_shipment()
+    shipment.status = "IN_TRANSIT"
+    shipment.save()
+    event = AuditEvent.objects.get(action="UPDATE")
+    assert event.changes_json is None
+    assert event_changes(event) == {"status": ["CREATED", "IN_TRANSIT"]}
+
+
+def test_entity_state_rebuilt_from_deltas(db, make_shipment):
+    shipment = make_shipment()
+    shipment.status = "IN_TRANSIT"
+    shipment.save()
+    after_first_update = AuditEvent.objects.get(action="UPDATE").created_at
+    shipment.status = "ARRIVED"
+    shipment.bl_no = "BL-2"
+    shipment.save()
+
+    state = entity_state_at("ContainerShipment", shipment.pk)
+    assert state["status"] == "ARRIVED"
+    assert state["bl_no"] == "BL-2"
+    assert state["container_no"] == "CONT-1"
+    assert entity_state_at("ContainerShipment", shipment.pk, at=after_first_update)["status"] == "IN_TRANSIT"
+
+    pk = shipment.pk
+    shipment.delete()
+    assert entity_state_at("ContainerShipment", pk) is None
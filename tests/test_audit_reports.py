@@ -1,10 +1,21 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
 from django.utils import timezone
 from rest_framework import status
 
-from audit.models import AuditEvent
+from audit.models import AuditEvent, AuditHourlyRollup
+from audit.rollups import bump_rollups
+from reports.utils import build_audit_report
 
 
-def test_shipment_creates_audit(api_client, boss_user):
+def test_shipment_creates_audit(api_client, boss_user, django_capture_on_commit_callbacks):
     api_client.force_authenticate(user=boss_user)
     payload = {
         "container_no": "CONT-100",
@@ -17,7 +28,8 @@ def test_shipment_creates_audit(api_client, boss_user):
         "destination_site": "PN",
         "client_name": "",
     }
-    response = api_client.post("/api/shipments/", payload, format="json")
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post("/api/shipments/", payload, format="json")
     assert response.status_code == status.HTTP_201_CREATED
     assert AuditEvent.objects.filter(action="CREATE", entity_type="ContainerShipment").exists()
 
@@ -27,3 +39,109 @@ def test_report_daily_accessible_to_boss(api_client, boss_user):
     date_str = timezone.now().date().isoformat()
     response = api_client.get(f"/api/reports/audit/daily?date={date_str}")
     assert response.status_code == status.HTTP_200_OK
+
+
+def test_report_counts_come_from_rollups(boss_user, make_shipment):
+    make_shipment()
+    assert AuditHourlyRollup.objects.filter(action="CREATE", site="PN").get().event_count == 1
+
+    report = build_audit_report("daily", {"date": timezone.now().date().isoformat()})
+    assert report["total_events"] == 1
+    assert report["events_by_action"] == {"CREATE": 1}
+    assert report["events_by_site"] == {"PN": 1}
+
+
+def test_backfill_rebuilds_rollups(boss_user):
+    AuditEvent.objects.create(action="SALE", entity_type="Sale", entity_id="1", site="KIN", summary="Sale 1")
+    AuditEvent.objects.create(action="SALE", entity_type="Sale", entity_id="2", site="KIN", summary="Sale 2")
+    assert not AuditHourlyRollup.objects.exists()
+
+    call_command("backfill_audit_rollups", stdout=StringIO())
+
+    assert AuditHourlyRollup.objects.get(action="SALE", site="KIN").event_count == 2
+
+
+def test_rollup_rows_are_unique_and_concurrent_insert_falls_back_to_update(db):
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    AuditHourlyRollup.objects.create(hour=hour, action="SALE", site="KIN", event_count=1)
+    with pytest.raises(IntegrityError), transaction.atomic():
+        AuditHourlyRollup.objects.create(hour=hour, action="SALE", site="KIN", event_count=1)
+
+    # The first UPDATE misses as if another flush inserted the row in between.
+    real_update = QuerySet.update
+    calls = []
+
+    def racing_update(self, **kwargs):
+        calls.append(kwargs)
+        return 0 if len(calls) == 1 else real_update(self, **kwargs)
+
+    event = AuditEvent(action="SALE", entity_type="Sale", entity_id="1", site="KIN", summary="Sale 1", created_at=hour)
+    with mock.patch.object(QuerySet, "update", racing_update):
+        bump_rollups([event, event])
+    assert AuditHourlyRollup.objects.get(action="SALE", site="KIN").event_count == 3
+
+
+def test_deleting_an_actor_folds_rollups_into_anonymous_rows(db, django_user_model):
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    user = django_user_model.objects.create_user(
+        email="agent@example.com", password="pass1234", full_name="Agent", role="BRANCH_AGENT", site="KIN"
+    )
+    AuditHourlyRollup.objects.create(hour=hour, action="SALE", site="KIN", event_count=1)
+    AuditHourlyRollup.objects.create(hour=hour, action="SALE", site="KIN", actor=user, event_count=2)
+    AuditHourlyRollup.objects.create(hour=hour, action="STOCK_MOVE", site="KIN", actor=user, event_count=4)
+
+    user.delete()
+
+    rows = AuditHourlyRollup.objects.values_list("action", "actor_id", "event_count").order_by("action")
+    assert list(rows) == [("SALE", None, 3), ("STOCK_MOVE", None, 4)]
+
+
+def test_closed_period_report_is_cached_and_revalidated(api_client, boss_user, settings, tmp_path):
+    settings.REPORTS_OUTPUT_DIR = tmp_path
+    cache.clear()
+    api_client.force_authenticate(user=boss_user)
+    yesterday = (timezone.now().date() - timedelta(days=1)).isoformat()
+    url = f"/api/reports/audit/daily/?date={yesterday}"
+
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Last-Modified"]
+    etag = response["ETag"]
+
+    AuditEvent.objects.create(action="SALE", entity_type="Sale", entity_id="1", site="KIN", summary="Sale 1")
+    assert api_client.get(url).data == response.data
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+    assert (
+        api_client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code
+        == status.HTTP_304_NOT_MODIFIED
+    )
+
+
+def test_open_period_report_is_computed_live(api_client, boss_user):
+    cache.clear()
+    api_client.force_authenticate(user=boss_user)
+    url = f"/api/reports/audit/daily/?date={timezone.now().date().isoformat()}"
+    assert api_client.get(url).data["total_events"] == 0
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    AuditHourlyRollup.objects.create(hour=hour, action="SALE", site="KIN", event_count=1)
+    response = api_client.get(url)
+    assert response.data["total_events"] == 1
+    assert "Last-Modified" not in response
+
+
+def test_generate_audit_report_range_skips_existing(db, settings, tmp_path):
+    settings.REPORTS_OUTPUT_DIR = tmp_path
+    (tmp_path / "audit_daily_2026-01-02.json").write_text("{}")
+
+    out = StringIO()
+    call_command("generate_audit_report", period="daily", date_from="2026-01-01", date_to="2026-01-03", workers=1, stdout=out)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "audit_daily_2026-01-01.json",
+        "audit_daily_2026-01-02.json",
+        "audit_daily_2026-01-03.json",
+    ]
+    assert (tmp_path / "audit_daily_2026-01-02.json").read_text() == "{}"
+    assert "2 reports written, 1 already present" in out.getvalue()
+
+    call_command("generate_audit_report", period="daily", date_from="2026-01-02", date_to="2026-01-02", workers=1, force=True, stdout=StringIO())
+    assert (tmp_path / "audit_daily_2026-01-02.json").read_text() != "{}"
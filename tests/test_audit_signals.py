@@ -0,0 +1,112 @@
+from datetime import date
+
+import pytest
+from django.db import connection, transaction
+from django.db.models.signals import pre_save
+from django.test.utils import CaptureQueriesContext
+
+from audit.models import AuditEvent
+from audit.registry import is_tracked
+from audit.sites import resolve_site, shipment_sites
+from chat.models import ChatMessage
+from documents.models import Document
+from logistics.models import ContainerShipment, StatusHistory
+
+
+def test_update_of_loaded_instance_does_not_requery(db, make_shipment):
+    shipment = ContainerShipment.objects.get(pk=make_shipment().pk)
+    shipment.status = "IN_TRANSIT"
+    with CaptureQueriesContext(connection) as ctx:
+        shipment.save(update_fields=["status"])
+    selects = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+    assert not [sql for sql in selects if "logistics_containershipment" in sql]
+    event = AuditEvent.objects.get(action="UPDATE")
+    assert event.changes_json == {"status": ["CREATED", "IN_TRANSIT"]}
+
+
+def test_consecutive_saves_diff_against_last_save(db, make_shipment):
+    shipment = make_shipment()
+    shipment.status = "IN_TRANSIT"
+    shipment.save()
+    shipment.status = "ARRIVED"
+    shipment.save()
+    event = AuditEvent.objects.filter(action="UPDATE").order_by("-id").first()
+    assert event.changes_json == {"status": ["IN_TRANSIT", "ARRIVED"]}
+
+
+def test_loaded_value_reports_the_last_saved_value(db, make_shipment):
+    assert ContainerShipment(status="CREATED").loaded_value("status", "unknown") == "unknown"
+    shipment = ContainerShipment.objects.get(pk=make_shipment().pk)
+    shipment.status = "IN_TRANSIT"
+    assert shipment.loaded_value("status") == "CREATED"
+    shipment.save()
+    assert shipment.loaded_value("status") == "IN_TRANSIT"
+
+
+def test_unloaded_instance_falls_back_to_database(db, make_shipment):
+    pk = make_shipment().pk
+    shipment = ContainerShipment.objects.only("id", "status").get(pk=pk)
+    shipment.status = "DELIVERED"
+    shipment.save()
+    event = AuditEvent.objects.get(action="UPDATE")
+    assert event.changes_json == {"status": ["CREATED", "DELIVERED"]}
+
+
+def test_equal_values_in_another_form_are_not_changes(db, make_shipment):
+    shipment = ContainerShipment.objects.get(pk=make_shipment().pk)
+    shipment.eta = date(2024, 1, 5)
+    shipment.save()
+    shipment.eta = "2024-01-05"
+    shipment.status = "IN_TRANSIT"
+    shipment.save()
+    shipment.save()
+    event = AuditEvent.objects.filter(action="UPDATE").order_by("-id").first()
+    assert event.changes_json == {"status": ["CREATED", "IN_TRANSIT"]}
+    assert AuditEvent.objects.filter(action="UPDATE").count() == 2
+
+
+def test_status_change_audit_does_not_load_shipment(db, django_capture_on_commit_callbacks, make_shipment):
+    with django_capture_on_commit_callbacks(execute=True):
+        shipment_id = make_shipment().pk
+    with CaptureQueriesContext(connection) as ctx:
+        StatusHistory.objects.create(shipment_id=shipment_id, from_status="CREATED", to_status="IN_TRANSIT")
+    selects = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+    assert not [sql for sql in selects if "logistics_containershipment" in sql]
+    event = AuditEvent.objects.get(action="STATUS_CHANGE")
+    assert (event.entity_type, event.entity_id, event.site) == ("ContainerShipment", str(shipment_id), "PN")
+
+
+def test_rolled_back_site_change_is_not_cached(db, django_capture_on_commit_callbacks, make_shipment):
+    with django_capture_on_commit_callbacks(execute=True):
+        shipment = make_shipment()
+    with pytest.raises(RuntimeError), transaction.atomic():
+        shipment.destination_site = "KIN"
+        shipment.save()
+        raise RuntimeError
+    assert shipment_sites.get(shipment.pk) == "PN"
+
+
+def test_receivers_are_connected_only_for_registered_models():
+    assert is_tracked(ContainerShipment)
+    assert not is_tracked(ChatMessage)
+    assert not pre_save.has_listeners(ChatMessage)
+    assert not pre_save.has_listeners(AuditEvent)
+
+
+def test_document_site_resolved_without_loading_shipment(db, django_capture_on_commit_callbacks, make_shipment):
+    with django_capture_on_commit_callbacks(execute=True):
+        shipment_id = make_shipment().pk
+    document = Document(linked_shipment_id=shipment_id, doc_type="BL", file="documents/bl/x.pdf")
+    with CaptureQueriesContext(connection) as ctx:
+        assert resolve_site(document) == "PN"
+    assert not ctx.captured_queries
+    document.save()
+    assert set(AuditEvent.objects.filter(entity_type="Document").values_list("site", flat=True)) == {"PN"}
+
+
+def test_site_cache_follows_shipment_changes(db, make_shipment):
+    shipment = make_shipment()
+    shipment.destination_site = "KIN"
+    shipment.save()
+    Document.objects.create(linked_shipment_id=shipment.pk, doc_type="BL", file="documents/bl/x.pdf")
+    assert AuditEvent.objects.filter(action="UPLOAD_DOC").get().site == "KIN"
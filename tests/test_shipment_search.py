@@ -0,0 +1,26 @@
+import pytest
+
+from logistics.models import ContainerShipment
+from logistics.search import search_shipments
+
+
+@pytest.mark.django_db
+def test_search_ranks_exact_then_prefix_then_contains(make_shipment):
+    contains = make_shipment("XMSCU1234", bl_no="BL-9")
+    exact = make_shipment("MSCU1234", bl_no="BL-1")
+    prefix = make_shipment("MSCU12345", bl_no="BL-2")
+    make_shipment("CMAU0001", bl_no="BL-3", client_name="Other")
+
+    results = list(search_shipments(ContainerShipment.objects.all(), " mscu1234 "))
+    assert results == [exact, prefix, contains]
+
+
+@pytest.mark.django_db
+def test_api_q_filter(api_client, boss_user, make_shipment):
+    make_shipment("MSCU1234", bl_no="BL-1")
+    make_shipment("CMAU0001", bl_no="BL-3", client_name="Mscu Trading")
+    api_client.force_authenticate(user=boss_user)
+    res = api_client.get("/api/shipments/", {"q": "mscu"})
+    assert res.status_code == 200
+    rows = res.data["results"] if isinstance(res.data, dict) else res.data
+    assert [r["container_no"] for r in rows] == ["MSCU1234", "CMAU0001"]
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+
+from chat.models import ChatMessage
+from core.models import ShipmentUpdate
+from logistics.models import ContainerItem, StatusHistory
+from reports.facts import refresh_site_facts, site_trends
+from reports.models import SiteDailyFact
+from stock.models import Sale, SaleLine, StockMovement
+from supply.models import Product
+
+
+def _populate(make_shipment):
+    product = Product.objects.create(sku="SKU-1", name="Widget")
+    shipment = make_shipment("CONT-1", "PN")
+    other = make_shipment("CONT-2", "KIN", status="DELIVERED")
+    ContainerItem.objects.create(shipment=shipment, product=product, qty=2, unit_price=Decimal("5.00"))
+    StatusHistory.objects.create(shipment=shipment, from_status="IN_TRANSIT", to_status="DELIVERED")
+    # Document uploads copy the current status into an update; that is not a delivery.
+    ShipmentUpdate.objects.create(shipment=other, status="DELIVERED")
+    ChatMessage.objects.create(shipment=shipment, site="PN", body="hello")
+    StockMovement.objects.create(movement_type="IN", site="PN", product=product, qty=7)
+    StockMovement.objects.create(movement_type="OUT", site="PN", product=product, qty=3)
+    sale = Sale.objects.create(site="PN", client_local="Shop")
+    SaleLine.objects.create(sale=sale, product=product, qty=2, unit_price=Decimal("4.00"))
+    SaleLine.objects.create(sale=sale, product=product, qty=1, unit_price=Decimal("1.50"))
+
+
+def test_refresh_is_idempotent_and_picks_up_late_rows(db, make_shipment):
+    _populate(make_shipment)
+    today = timezone.localdate()
+
+    assert refresh_site_facts(today, today) == 2
+    assert refresh_site_facts(today, today) == 2
+    pn = SiteDailyFact.objects.get(day=today, site="PN")
+    assert pn.shipments_created == 1
+    assert pn.shipments_delivered == 1
+    assert pn.value_shipped == Decimal("10.00")
+    assert pn.chat_messages == 1
+    assert (pn.stock_in_qty, pn.stock_out_qty) == (7, 3)
+    assert (pn.sales_count, pn.sales_value) == (1, Decimal("9.50"))
+    kin = SiteDailyFact.objects.get(day=today, site="KIN")
+    assert (kin.shipments_created, kin.shipments_delivered) == (1, 0)
+
+    make_shipment("CONT-3", "PN")
+    out = StringIO()
+    call_command("refresh_site_facts", "--days", "2", stdout=out)
+    assert SiteDailyFact.objects.get(day=today, site="PN").shipments_created == 2
+    assert SiteDailyFact.objects.count() == 2
+    assert "2 site facts written" in out.getvalue()
+
+
+def test_trends_read_past_days_from_facts(db, make_shipment):
+    _populate(make_shipment)
+    yesterday = timezone.localdate() - timedelta(days=1)
+    SiteDailyFact.objects.create(day=yesterday, site="DLA", shipments_created=4)
+
+    rows = site_trends(yesterday, timezone.localdate())
+    assert [(row["day"], row["site"]) for row in rows] == [
+        (yesterday, "DLA"),
+        (timezone.localdate(), "KIN"),
+        (timezone.localdate(), "PN"),
+    ]
+    assert rows[0]["shipments_created"] == 4
+    assert rows[2]["sales_value"] == Decimal("9.50")
+
+
+def test_site_trends_api(api_client, boss_user, make_shipment):
+    _populate(make_shipment)
+    api_client.force_authenticate(user=boss_user)
+    response = api_client.get("/api/reports/site-trends/", {"site": "PN"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["totals"]["shipments_created"] == 1
+    assert list(response.data["by_site"]) == ["PN"]
+
+    response = api_client.get("/api/reports/site-trends/", {"from": "2024-02-30"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST